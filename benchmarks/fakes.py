@@ -0,0 +1,371 @@
+"""
+In-process stand-ins for ClickUp, OpenAI and Pinecone used by the offline benchmarks.
+
+Each fake mimics the response shapes the pipeline reads and adds configurable
+latency (and, for ClickUp, a request-per-minute limit) so throughput and latency
+numbers move the same way they would against the real services.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+import types
+from datetime import datetime, timedelta
+from src.utils.rate_limit import TokenBucket
+
+WORDS = (
+    "deploy fix review api login page bug sprint design mobile backend frontend cache "
+    "release test schema migration dashboard report invoice payment search filter user "
+    "client meeting estimate refactor docs onboarding alert metrics queue worker export"
+).split()
+PEOPLE = ["Ali", "Sajawal khan", "Sara", "Usman", "Hina", "Bilal", "Ayesha", "Omar"]
+STATUSES = ["to do", "in progress", "review", "done"]
+PRIORITIES = ["urgent", "high", "normal", "low"]
+
+
+class FakeRateLimitError(Exception):
+    """Raised by the fakes when more calls are in flight than their capacity, like an HTTP 429."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=0.5):
+        super().__init__("rate limited")
+        self.headers = {"retry-after": str(retry_after)}
+
+
+class _Capacity:
+    """Concurrent call capacity of a fake service; None means unlimited."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            if self.limit is not None and self.in_flight >= self.limit:
+                self.rejected += 1
+                raise FakeRateLimitError()
+            self.in_flight += 1
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def _sleep(seconds):
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+class SyntheticWorkspace:
+    """Deterministic ClickUp-shaped workspace of configurable size."""
+
+    def __init__(
+        self,
+        spaces=1,
+        folders_per_space=3,
+        lists_per_folder=2,
+        tasks_per_list=20,
+        comments_per_task=3,
+        replies_per_comment=1,
+        activity_per_task=2,
+        description_words=60,
+        seed=7,
+    ):
+        self.rng = random.Random(seed)
+        self.team = {"id": "900", "name": "Bench Team"}
+        self.spaces = [{"id": f"s{i}", "name": f"Space {i}"} for i in range(spaces)]
+        self.folders, self.lists, self.tasks = {}, {}, {}
+        self.comments, self.replies, self.activity = {}, {}, {}
+        now = datetime.now()
+
+        for space in self.spaces:
+            self.folders[space["id"]] = []
+            for f in range(folders_per_space):
+                folder = {"id": f"{space['id']}f{f}", "name": f"Project {space['id'].upper()}{f}"}
+                self.folders[space["id"]].append(folder)
+                self.lists[folder["id"]] = []
+                for l in range(lists_per_folder):
+                    lst = {"id": f"{folder['id']}l{l}", "name": f"Sprint {l}"}
+                    self.lists[folder["id"]].append(lst)
+                    self.tasks[lst["id"]] = [
+                        self._task(f"{lst['id']}t{t}", now, description_words)
+                        for t in range(tasks_per_list)
+                    ]
+                    for task in self.tasks[lst["id"]]:
+                        self._discussion(task, now, comments_per_task, replies_per_comment, activity_per_task)
+
+    def _words(self, n):
+        return " ".join(self.rng.choice(WORDS) for _ in range(n))
+
+    def _ms(self, now, max_days):
+        return str(int((now - timedelta(days=self.rng.uniform(0, max_days))).timestamp() * 1000))
+
+    def _user(self):
+        name = self.rng.choice(PEOPLE)
+        return {"id": PEOPLE.index(name) + 1, "username": name}
+
+    def _task(self, task_id, now, description_words):
+        return {
+            "id": task_id,
+            "name": f"{self._words(3).title()} {task_id}",
+            "description": self._words(description_words),
+            "status": {"status": self.rng.choice(STATUSES)},
+            "priority": {"priority": self.rng.choice(PRIORITIES)},
+            "assignees": [self._user() for _ in range(self.rng.randint(1, 2))],
+            "tags": [{"name": self.rng.choice(WORDS)}],
+            "date_created": self._ms(now, 60),
+            "date_updated": self._ms(now, 14),
+            "due_date": self._ms(now, -14),
+            "custom_fields": [],
+        }
+
+    def _discussion(self, task, now, comments, replies, activity):
+        self.comments[task["id"]] = []
+        for c in range(comments):
+            comment = {
+                "id": f"{task['id']}c{c}",
+                "comment_text": self._words(25),
+                "date": self._ms(now, 14),
+                "user": self._user(),
+            }
+            self.comments[task["id"]].append(comment)
+            self.replies[comment["id"]] = [
+                {"comment_text": self._words(12), "date": self._ms(now, 7), "user": self._user()}
+                for _ in range(replies)
+            ]
+        self.activity[task["id"]] = [
+            {
+                "date": self._ms(now, 14),
+                "text_content": f"status changed to {self.rng.choice(STATUSES)}",
+                "type": "status",
+                **{"username": user["username"], "user_id": user["id"]},
+            }
+            for user in (self._user() for _ in range(activity))
+        ]
+
+    @property
+    def total_tasks(self):
+        return sum(len(tasks) for tasks in self.tasks.values())
+
+
+class FakeClickUpClient:
+    """ClickUpClient stand-in serving a SyntheticWorkspace with latency and a rate limit."""
+
+    PAGE_SIZE = 100
+
+    def __init__(self, workspace, latency=0.05, requests_per_minute=6000):
+        self.workspace = workspace
+        self.latency = latency
+        self.rate_limiter = TokenBucket(requests_per_minute, period=60.0)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _call(self, value):
+        self.rate_limiter.acquire()
+        with self._lock:
+            self.requests += 1
+        _sleep(self.latency)
+        return value
+
+    def get_teams(self):
+        return self._call({"teams": [self.workspace.team]})
+
+    def get_spaces(self, team_id):
+        return self._call({"spaces": self.workspace.spaces})
+
+    def get_folders(self, space_id):
+        return self._call({"folders": self.workspace.folders.get(space_id, [])})
+
+    def get_lists(self, folder_id):
+        return self._call({"lists": self.workspace.lists.get(folder_id, [])})
+
+    def get_folderless_lists(self, space_id):
+        return self._call({"lists": []})
+
+    def get_task(self, task_id):
+        for space in self.workspace.spaces:
+            for folder in self.workspace.folders[space["id"]]:
+                for lst in self.workspace.lists[folder["id"]]:
+                    for task in self.workspace.tasks[lst["id"]]:
+                        if task["id"] == task_id:
+                            return self._call({
+                                **task,
+                                "team_id": self.workspace.team["id"],
+                                "space": {"id": space["id"]},
+                                "folder": {**folder, "hidden": False},
+                                "list": lst,
+                            })
+        raise KeyError(task_id)
+
+    def task_exists(self, task_id):
+        try:
+            self.get_task(task_id)
+            return True
+        except KeyError:
+            return False
+
+    def get_tasks(self, list_id, page=0, **params):
+        tasks = self.workspace.tasks.get(list_id, [])
+        if "date_updated_gt" in params:
+            tasks = [t for t in tasks if int(t["date_updated"]) > int(params["date_updated_gt"])]
+        start = page * self.PAGE_SIZE
+        return self._call({
+            "tasks": tasks[start:start + self.PAGE_SIZE],
+            "last_page": start + self.PAGE_SIZE >= len(tasks),
+        })
+
+    def iter_tasks(self, list_id, **params):
+        page = 0
+        while True:
+            response = self.get_tasks(list_id, page=page, **params)
+            yield from response["tasks"]
+            if response["last_page"]:
+                return
+            page += 1
+
+    def get_task_comments(self, task_id):
+        return self._call({"comments": [dict(c) for c in self.workspace.comments.get(task_id, [])]})
+
+    def get_comment_thread(self, comment_id):
+        return self._call(self.workspace.replies.get(comment_id, []))
+
+    def get_task_activity(self, task_id):
+        return self._call({"activities": self.workspace.activity.get(task_id, [])})
+
+    def get_task_time_in_status(self, task_id):
+        return self._call({})
+
+
+class FakeEncoding:
+    """
+    tiktoken encoding stand-in that needs no downloaded BPE files.
+
+    Splits text into pieces of up to four characters (about the size of a cl100k_base
+    token for English), so token counts, budgets and truncation behave realistically.
+    """
+
+    _PIECE = re.compile(r"\s*\S{1,4}|\s+")
+
+    def __init__(self):
+        self._ids = {}
+        self._pieces = []
+        self._lock = threading.Lock()
+
+    def encode(self, text, **kwargs):
+        tokens = []
+        with self._lock:
+            for piece in self._PIECE.findall(text):
+                if piece not in self._ids:
+                    self._ids[piece] = len(self._pieces)
+                    self._pieces.append(piece)
+                tokens.append(self._ids[piece])
+        return tokens
+
+    def decode(self, tokens):
+        return "".join(self._pieces[token] for token in tokens)
+
+
+def fake_embedding(text, dimension=1536):
+    """Deterministic pseudo-embedding: similar for texts sharing words, identical for identical text."""
+    vector = [0.0] * dimension
+    for word in text.lower().split():
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        slot = int.from_bytes(digest[:4], "little") % dimension
+        vector[slot] += 1.0 if digest[4] & 1 else -1.0
+    return vector
+
+
+class FakeOpenAI:
+    """openai.OpenAI stand-in with embeddings and chat completions (blocking and streaming)."""
+
+    def __init__(self, embed_latency=0.3, embed_latency_per_input=0.0005, chat_latency=1.5, token_latency=0.02, embed_capacity=None):
+        self.embed_capacity = _Capacity(embed_capacity)
+        self.embed_latency = embed_latency
+        self.embed_latency_per_input = embed_latency_per_input
+        self.chat_latency = chat_latency
+        self.token_latency = token_latency
+        self.calls = {"embeddings": 0, "embedded_inputs": 0, "chat": 0}
+        self._lock = threading.Lock()
+        self.embeddings = types.SimpleNamespace(create=self._create_embeddings)
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create_chat))
+
+    def with_options(self, **options):
+        return self
+
+    def _create_embeddings(self, input, model):
+        inputs = input if isinstance(input, list) else [input]
+        with self.embed_capacity:
+            with self._lock:
+                self.calls["embeddings"] += 1
+                self.calls["embedded_inputs"] += len(inputs)
+            _sleep(self.embed_latency + self.embed_latency_per_input * len(inputs))
+        return types.SimpleNamespace(
+            data=[types.SimpleNamespace(index=i, embedding=fake_embedding(text)) for i, text in enumerate(inputs)],
+            usage=types.SimpleNamespace(prompt_tokens=sum(len(t.split()) for t in inputs), total_tokens=0),
+        )
+
+    def _create_chat(self, model, messages, temperature=0, stream=False, **kwargs):
+        with self._lock:
+            self.calls["chat"] += 1
+        # The filter extraction prompt asks for JSON only
+        text = "{}" if "Respond ONLY with a valid JSON object" in messages[0]["content"] else (
+            "Here is a summary of the recent work: " + " ".join(WORDS[:40])
+        )
+        tokens = [word + " " for word in text.split()]
+        if not stream:
+            _sleep(self.chat_latency + self.token_latency * len(tokens))
+            return types.SimpleNamespace(
+                choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=text))],
+                usage=types.SimpleNamespace(prompt_tokens=0, completion_tokens=len(tokens), total_tokens=len(tokens)),
+            )
+
+        def chunks():
+            _sleep(self.chat_latency)
+            for token in tokens:
+                _sleep(self.token_latency)
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=token))])
+
+        return chunks()
+
+
+class FakePineconeIndex:
+    """In-memory Pinecone index stand-in with upsert/query/delete/list/describe_index_stats."""
+
+    def __init__(self, upsert_latency=0.05, query_latency=0.05, upsert_capacity=None):
+        from src.vectorstore.local_store import LocalVectorStore
+        import tempfile
+
+        self.upsert_latency = upsert_latency
+        self.upsert_capacity = _Capacity(upsert_capacity)
+        self.query_latency = query_latency
+        self.calls = {"upsert": 0, "query": 0, "delete": 0}
+        # Reuse the local store for the actual vector math and filtering
+        self._store = LocalVectorStore(tempfile.mkdtemp(prefix="fake-pinecone-"))
+
+    def upsert(self, vectors, namespace=""):
+        with self.upsert_capacity:
+            self.calls["upsert"] += 1
+            _sleep(self.upsert_latency)
+            self._store.upsert(vectors, namespace=namespace)
+
+    def query(self, vector, top_k, namespace="", filter=None, include_metadata=False, include_values=False):
+        self.calls["query"] += 1
+        _sleep(self.query_latency)
+        return self._store.query(vector, top_k, namespace, filter, include_metadata, include_values)
+
+    def delete(self, ids, namespace=""):
+        self.calls["delete"] += 1
+        self._store.delete(ids, namespace=namespace)
+
+    def list(self, prefix=None, namespace="", limit=100):
+        ids = list(self._store.list_ids(namespace, prefix=prefix))
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def describe_index_stats(self):
+        counts = self._store.namespace_counts()
+        return {"namespaces": {ns: {"vector_count": count} for ns, count in counts.items()}}
@@ -0,0 +1,231 @@
+"""
+Offline benchmark for ingestion throughput and question latency.
+
+Runs ingest_clickup_tasks and run_rag_pipeline against the in-process fakes in
+benchmarks/fakes.py, so no ClickUp, OpenAI or Pinecone credentials are needed,
+nothing goes over the network and runs are repeatable. Token counting uses an
+approximate offline encoder unless --real-tokenizer is given, which needs
+tiktoken's cl100k_base file to be downloadable or already in TIKTOKEN_CACHE_DIR.
+Latency and rate limits of every fake are flags, e.g.
+
+    python -m benchmarks.run_benchmark --spaces 2 --tasks-per-list 50 --questions 30
+    python -m benchmarks.run_benchmark --store local --clickup-rpm 100 --json results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+# Isolate local state (sync watermarks, caches, doc store) and keep the real
+# OpenAI client constructible before any src module is imported
+os.environ["MERGESTACK_DATA_DIR"] = tempfile.mkdtemp(prefix="mergestack-bench-")
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+from benchmarks.fakes import PEOPLE, FakeClickUpClient, FakeEncoding, FakeOpenAI, FakePineconeIndex, SyntheticWorkspace
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline ingest and query benchmark.")
+    workspace = parser.add_argument_group("synthetic workspace")
+    workspace.add_argument("--spaces", type=int, default=1)
+    workspace.add_argument("--folders-per-space", type=int, default=3)
+    workspace.add_argument("--lists-per-folder", type=int, default=2)
+    workspace.add_argument("--tasks-per-list", type=int, default=20)
+    workspace.add_argument("--comments-per-task", type=int, default=3)
+    workspace.add_argument("--replies-per-comment", type=int, default=1)
+    workspace.add_argument("--activity-per-task", type=int, default=2)
+    workspace.add_argument("--description-words", type=int, default=60)
+    workspace.add_argument("--seed", type=int, default=7)
+
+    services = parser.add_argument_group("service stand-ins")
+    services.add_argument("--clickup-latency-ms", type=float, default=50)
+    services.add_argument("--clickup-rpm", type=int, default=6000, help="ClickUp requests per minute")
+    services.add_argument("--embed-latency-ms", type=float, default=300)
+    services.add_argument("--chat-latency-ms", type=float, default=1500, help="Time before the first answer token")
+    services.add_argument("--token-latency-ms", type=float, default=20, help="Time per answer token")
+    services.add_argument("--pinecone-latency-ms", type=float, default=50)
+    services.add_argument("--embed-capacity", type=int, default=None,
+                          help="Concurrent embedding calls before the fake answers 429")
+    services.add_argument("--pinecone-capacity", type=int, default=None,
+                          help="Concurrent upserts before the fake index answers 429")
+    services.add_argument("--store", choices=["pinecone", "local"], default="pinecone",
+                          help="Fake Pinecone index behind PineconeVectorStore, or the real LocalVectorStore")
+
+    run = parser.add_argument_group("run")
+    run.add_argument("--workers", type=int, default=None, help="Ingest workers per space (default CLICKUP_MAX_WORKERS)")
+    run.add_argument("--questions", type=int, default=20)
+    run.add_argument("--skip-queries", action="store_true")
+    run.add_argument("--real-tokenizer", action="store_true",
+                     help="Count tokens with tiktoken instead of the offline approximation")
+    run.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    run.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    return parser.parse_args(argv)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def make_questions(workspace, count):
+    """Distinct questions in the shapes users ask, so no cache hides the query path."""
+    projects = [f["name"] for folders in workspace.folders.values() for f in folders]
+    templates = [
+        "What did {person} work on this week?",
+        "What is the status of the {project} tasks?",
+        "Which tasks are blocked in {project}?",
+        "Summarize the latest comments from {person}",
+        "What did {person} do yesterday on {project}?",
+    ]
+    return [
+        templates[i % len(templates)].format(person=PEOPLE[i % len(PEOPLE)], project=projects[i % len(projects)])
+        + ("" if i < len(templates) * len(PEOPLE) else f" ({i})")
+        for i in range(count)
+    ]
+
+
+def install_fakes(args, workspace):
+    """Point the pipeline at the fakes and return them."""
+    import src.clickup.ingest as ingest
+    import src.openai.client as openai_client
+    import src.vectorstore.client as vectorstore_client
+
+    clickup = FakeClickUpClient(workspace, latency=args.clickup_latency_ms / 1000, requests_per_minute=args.clickup_rpm)
+    openai = FakeOpenAI(
+        embed_latency=args.embed_latency_ms / 1000,
+        chat_latency=args.chat_latency_ms / 1000,
+        token_latency=args.token_latency_ms / 1000,
+        embed_capacity=args.embed_capacity,
+    )
+    ingest.ClickUpClient = lambda: clickup
+    openai_client.client = openai
+    if not args.real_tokenizer:
+        # Chunking, packing and embedding truncation all get their encoding from get_encoding
+        encoding = FakeEncoding()
+        openai_client.tiktoken = types.SimpleNamespace(encoding_for_model=lambda model: encoding)
+        openai_client.get_encoding.cache_clear()
+
+    pinecone_index = None
+    if args.store == "local":
+        from src.vectorstore.local_store import LocalVectorStore
+        vectorstore_client._store = LocalVectorStore()
+    else:
+        from src.vectorstore.pinecone_store import PineconeVectorStore
+        pinecone_index = FakePineconeIndex(
+            upsert_latency=args.pinecone_latency_ms / 1000,
+            query_latency=args.pinecone_latency_ms / 1000,
+            upsert_capacity=args.pinecone_capacity,
+        )
+        vectorstore_client._store = PineconeVectorStore(index=pinecone_index)
+
+    return clickup, openai, pinecone_index
+
+
+def benchmark_ingest(args, workspace, output):
+    from src.clickup.catalog import make_namespace
+    from src.clickup.ingest import CLICKUP_MAX_WORKERS, ingest_clickup_tasks
+
+    results = []
+    for space in workspace.spaces:
+        namespace = make_namespace(workspace.team["id"], space["id"])
+        started = time.perf_counter()
+        with output():
+            summary = ingest_clickup_tasks(
+                workspace.team["id"],
+                space["id"],
+                namespace=namespace,
+                max_workers=args.workers or CLICKUP_MAX_WORKERS,
+            )
+        elapsed = time.perf_counter() - started
+        results.append({
+            "namespace": namespace,
+            "tasks": summary["tasks"],
+            "docs": summary["docs"],
+            "upserted": summary["upserted"],
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(summary["docs"] / elapsed, 1) if elapsed else None,
+        })
+        print(f"📥 {namespace}: {summary['docs']} docs from {summary['tasks']} tasks in {elapsed:.2f}s "
+              f"({results[-1]['docs_per_second']} docs/s)")
+    return results
+
+
+def benchmark_queries(args, workspace, namespace, output):
+    from src.rag.rag_pipeline import run_rag_pipeline
+
+    latencies = []
+    for question in make_questions(workspace, args.questions):
+        started = time.perf_counter()
+        with output():
+            run_rag_pipeline(question, namespace=namespace)
+        latencies.append(time.perf_counter() - started)
+
+    result = {
+        "namespace": namespace,
+        "questions": len(latencies),
+        "p50_seconds": round(percentile(latencies, 50), 3),
+        "p95_seconds": round(percentile(latencies, 95), 3),
+        "mean_seconds": round(statistics.mean(latencies), 3),
+    }
+    print(f"💬 {len(latencies)} questions on {namespace}: p50 {result['p50_seconds']}s, "
+          f"p95 {result['p95_seconds']}s, mean {result['mean_seconds']}s")
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workspace = SyntheticWorkspace(
+        spaces=args.spaces,
+        folders_per_space=args.folders_per_space,
+        lists_per_folder=args.lists_per_folder,
+        tasks_per_list=args.tasks_per_list,
+        comments_per_task=args.comments_per_task,
+        replies_per_comment=args.replies_per_comment,
+        activity_per_task=args.activity_per_task,
+        description_words=args.description_words,
+        seed=args.seed,
+    )
+    clickup, openai, pinecone_index = install_fakes(args, workspace)
+
+    def output():
+        return contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    print(f"🧪 Benchmarking {workspace.total_tasks} tasks in {args.spaces} space(s) "
+          f"with the {args.store} store (state in {os.environ['MERGESTACK_DATA_DIR']})")
+
+    results = {"config": vars(args), "ingest": benchmark_ingest(args, workspace, output)}
+    if not args.skip_queries and args.questions > 0:
+        results["query"] = benchmark_queries(args, workspace, results["ingest"][0]["namespace"], output)
+
+    results["calls"] = {
+        "clickup_requests": clickup.requests,
+        "openai_embeddings_rejected": openai.embed_capacity.rejected,
+        **({"pinecone_upserts_rejected": pinecone_index.upsert_capacity.rejected} if pinecone_index else {}),
+        **{f"openai_{name}": count for name, count in openai.calls.items()},
+        **({f"pinecone_{name}": count for name, count in pinecone_index.calls.items()} if pinecone_index else {}),
+    }
+    print(f"📊 Calls: {results['calls']}")
+
+    from src.utils.adaptive_limiter import limiter_states
+    results["limiters"] = limiter_states()
+    print(f"🎚️ Adaptive limits: {results['limiters']}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json_path}")
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -14,23 +14,66 @@
 
 # main.py
 
-from src.rag.rag_pipeline import run_rag_pipeline
+import threading
+from src.rag.rag_pipeline import stream_rag_pipeline
+from src.clickup.catalog import (
+    catalog_namespaces,
+    is_catalog_fresh,
+    load_catalog,
+    refresh_catalog,
+    refresh_vector_counts,
+)
 from src.clickup.utils import get_all_namespaces
+from src.utils.metrics import METRICS_PORT, format_breakdown, start_metrics_server
+
+
+def refresh_catalog_in_background():
+    """Refresh the namespace catalog from ClickUp and the vector store without blocking the REPL."""
+    def refresh():
+        try:
+            refresh_catalog()
+            refresh_vector_counts()
+        except Exception as e:
+            print(f"\n⚠️ Background catalog refresh failed: {e}")
+
+    threading.Thread(target=refresh, name="catalog-refresh", daemon=True).start()
+
 
 def main():
-    namespaces = get_all_namespaces()
+    if METRICS_PORT:
+        start_metrics_server()
+
+    # Start from the local catalog; only the very first run has to wait for ClickUp
+    catalog = load_catalog()
+    namespaces = catalog_namespaces(catalog)
+    if not namespaces:
+        namespaces = get_all_namespaces(use_catalog=False)
+    elif not is_catalog_fresh(catalog):
+        refresh_catalog_in_background()
 
     if not namespaces:
         print("❌ No namespaces found. Have you ingested any data yet?")
         return
 
     print("\n📂 Available Namespaces:")
+    print("0. All namespaces (search every space at once)")
     for i, ns in enumerate(namespaces):
-        print(f"{i + 1}. {ns['team_name']} > {ns['space_name']} ({ns['namespace']})")
+        details = []
+        if "vector_count" in ns:
+            details.append(f"{ns['vector_count']} vectors")
+        if "last_synced_at" in ns:
+            details.append(f"synced {ns['last_synced_at']}")
+        suffix = f" — {', '.join(details)}" if details else ""
+        print(f"{i + 1}. {ns['team_name']} > {ns['space_name']} ({ns['namespace']}){suffix}")
 
     try:
         choice = int(input("\n🔍 Select a namespace by number: ")) - 1
-        selected_namespace = namespaces[choice]["namespace"]
+        if choice == -1:
+            selected_namespace = [ns["namespace"] for ns in namespaces]
+        elif choice < 0:
+            raise IndexError(choice)
+        else:
+            selected_namespace = namespaces[choice]["namespace"]
     except (IndexError, ValueError):
         print("❌ Invalid selection.")
         return
@@ -41,8 +84,21 @@ def main():
             break
 
         try:
-            answer = run_rag_pipeline(question, namespace=selected_namespace)
-            print(f"\n🤖 Answer:\n{answer}")
+            stats = {}
+            print("\n🤖 Answer:")
+            for token in stream_rag_pipeline(question, namespace=selected_namespace, stats=stats):
+                print(token, end="", flush=True)
+            print(
+                f"\n\n⏱️ First token after {stats.get('time_to_first_token', stats['total']):.2f}s, "
+                f"generation {stats['generation']:.2f}s, total {stats['total']:.2f}s"
+            )
+            print(f"   Stages: {format_breakdown(stats['stages'])}")
+            if len(stats.get("namespaces", {})) > 1:
+                slowest = sorted(stats["namespaces"].items(), key=lambda item: item[1]["seconds"], reverse=True)
+                print("   Namespaces: " + ", ".join(
+                    f"{ns} {timing['seconds']:.2f}s" + (" (failed)" if "error" in timing else "")
+                    for ns, timing in slowest
+                ))
         except Exception as e:
             print(f"❌ Error: {e}")
 
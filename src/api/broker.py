@@ -0,0 +1,153 @@
+# src/api/broker.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from src.openai.filter_rules import normalize_question
+from src.rag.rag_pipeline import stream_rag_pipeline
+
+load_dotenv()
+
+# Pipeline runs executing at once; identical questions share one run
+API_MAX_CONCURRENT = int(os.getenv("API_MAX_CONCURRENT", "16"))
+# Runs allowed to wait for a slot before new questions are turned away
+API_MAX_QUEUED = int(os.getenv("API_MAX_QUEUED", "32"))
+
+
+class Overloaded(Exception):
+    """Raised when too many questions are running or waiting."""
+
+
+class _Run:
+    """One pipeline run whose tokens are broadcast to every caller asking the same question."""
+
+    def __init__(self):
+        self.tokens = []
+        self.subscribers = []
+        self.stats = {}
+        self.done = False
+        self.error = None
+        # Set when every caller has gone, so the worker thread stops generating
+        self.abandoned = threading.Event()
+
+    def publish(self, item):
+        for queue in self.subscribers:
+            queue.put_nowait(item)
+
+
+class QuestionBroker:
+    """
+    Run questions through the blocking streaming pipeline from asyncio.
+
+    Identical in-flight questions (same normalized text and namespaces) are merged
+    into one pipeline run and every caller receives the full token stream. At most
+    max_concurrent runs execute in worker threads and max_queued wait for a slot;
+    beyond that ask() raises Overloaded.
+    """
+
+    def __init__(self, max_concurrent=API_MAX_CONCURRENT, max_queued=API_MAX_QUEUED, pipeline=stream_rag_pipeline):
+        self.pipeline = pipeline
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.runs = {}
+        # Runs started and not yet finished, whether executing or waiting for a slot
+        self.active = 0
+        self.stats = {"questions": 0, "merged": 0, "runs": 0, "rejected": 0}
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="api-pipeline")
+
+    @staticmethod
+    def key(question, namespace):
+        namespaces = (namespace,) if isinstance(namespace, str) else tuple(sorted(namespace))
+        return normalize_question(question), namespaces
+
+    async def ask(self, question, namespace):
+        """
+        Async generator answering a question.
+
+        Yields ("merged", bool) first, then ("token", str) items, and finally ("stats", dict)
+        with the pipeline timings. Pipeline errors are re-raised to every merged caller.
+        """
+        self.stats["questions"] += 1
+        key = self.key(question, namespace)
+        run = self.runs.get(key)
+        merged = run is not None
+        if merged:
+            self.stats["merged"] += 1
+        else:
+            if self.active >= self.max_concurrent + self.max_queued:
+                self.stats["rejected"] += 1
+                raise Overloaded()
+            self.active += 1
+            run = _Run()
+            self.runs[key] = run
+            asyncio.get_running_loop().create_task(self._execute(key, run, question, namespace))
+
+        queue = asyncio.Queue()
+        # Late joiners first get everything generated so far
+        for token in run.tokens:
+            queue.put_nowait(("token", token))
+        if run.done:
+            queue.put_nowait(("end", None))
+        run.subscribers.append(queue)
+        try:
+            yield "merged", merged
+            while True:
+                kind, value = await queue.get()
+                if kind == "end":
+                    break
+                yield kind, value
+            if run.error:
+                raise run.error
+            yield "stats", run.stats
+        finally:
+            run.subscribers.remove(queue)
+            if not run.subscribers and not run.done:
+                run.abandoned.set()
+                # Later identical questions must not join a run that is being stopped
+                if self.runs.get(key) is run:
+                    del self.runs[key]
+
+    async def _execute(self, key, run, question, namespace):
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slots:
+                self.stats["runs"] += 1
+                if not run.abandoned.is_set():
+                    await loop.run_in_executor(self._executor, self._generate, loop, run, question, namespace)
+        except Exception as e:
+            run.error = e
+        finally:
+            self.active -= 1
+            # A new identical question after this point starts a fresh run
+            if self.runs.get(key) is run:
+                del self.runs[key]
+            run.done = True
+            run.publish(("end", None))
+
+    def _generate(self, loop, run, question, namespace):
+        """Worker thread: pull tokens from the pipeline and hand them to the event loop."""
+        def publish_token(token):
+            run.tokens.append(token)
+            run.publish(("token", token))
+
+        started = time.perf_counter()
+        tokens = self.pipeline(question, namespace=namespace, stats=run.stats)
+        try:
+            for token in tokens:
+                if run.abandoned.is_set():
+                    break
+                loop.call_soon_threadsafe(publish_token, token)
+        finally:
+            tokens.close()
+            run.stats.setdefault("total", time.perf_counter() - started)
+
+    @property
+    def waiting(self):
+        """Runs waiting for a free slot."""
+        return max(self.active - self.max_concurrent, 0)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,169 @@
+# src/api/server.py
+import asyncio
+import json
+import os
+import re
+from aiohttp import web
+from dotenv import load_dotenv
+from src.api.broker import QuestionBroker, Overloaded
+from src.clickup.catalog import catalog_namespaces, load_catalog
+from src.utils.metrics import render_prometheus
+
+load_dotenv()
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+# Seconds a caller waits for a complete answer before getting a timeout
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "60"))
+# Seconds clients are told to wait after a 503
+API_RETRY_AFTER = int(os.getenv("API_RETRY_AFTER", "5"))
+
+BROKER_KEY = web.AppKey("broker", QuestionBroker)
+# Namespaces are also directory names of the local vector store, so nothing else gets through
+NAMESPACE_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def _bad_request(error):
+    return web.HTTPBadRequest(text=json.dumps({"error": error}), content_type="application/json")
+
+
+def resolve_namespaces(namespace):
+    """
+    Accept a namespace, a list of namespaces, or "all" for every namespace in the catalog.
+
+    Only namespaces listed in the catalog are accepted.
+    """
+    known = [entry["namespace"] for entry in catalog_namespaces(load_catalog())]
+    if namespace == "all":
+        if not known:
+            raise _bad_request("no namespaces ingested")
+        return known
+    if isinstance(namespace, str) and namespace:
+        requested = [namespace]
+    elif isinstance(namespace, list) and namespace and all(isinstance(ns, str) for ns in namespace):
+        requested = namespace
+    else:
+        raise _bad_request("namespace must be a string, a list of strings or \"all\"")
+    unknown = [ns for ns in requested if not NAMESPACE_PATTERN.fullmatch(ns) or ns not in known]
+    if unknown:
+        raise _bad_request(f"unknown namespace: {', '.join(unknown)}")
+    return namespace
+
+
+async def ask(request):
+    """
+    POST /ask {"question": str, "namespace": str | [str] | "all", "stream": bool}
+
+    Without streaming the reply is {"answer", "merged", "timings"}. With "stream": true
+    the reply is newline-delimited JSON: {"token": ...} lines, then {"done": true, "timings": ...}.
+    """
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise _bad_request("invalid JSON")
+    if not isinstance(body, dict):
+        raise _bad_request("body must be a JSON object")
+    question = body.get("question")
+    if not isinstance(question, str) or not question.strip():
+        raise _bad_request("question is required")
+    question = question.strip()
+    namespace = resolve_namespaces(body.get("namespace", "all"))
+
+    broker = request.app[BROKER_KEY]
+    answer = broker.ask(question, namespace)
+    try:
+        _, merged = await anext(answer)
+    except Overloaded:
+        return web.json_response(
+            {"error": "too many questions in progress, retry later"},
+            status=503,
+            headers={"Retry-After": str(API_RETRY_AFTER)},
+        )
+
+    if body.get("stream"):
+        return await _stream_answer(request, answer, merged)
+
+    tokens, timings = [], {}
+    try:
+        async with asyncio.timeout(API_REQUEST_TIMEOUT):
+            async for kind, value in answer:
+                if kind == "token":
+                    tokens.append(value)
+                elif kind == "stats":
+                    timings = _timings(value)
+    except TimeoutError:
+        return web.json_response({"error": f"no answer within {API_REQUEST_TIMEOUT:.0f}s"}, status=504)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+    finally:
+        await answer.aclose()
+    return web.json_response({"answer": "".join(tokens), "merged": merged, "timings": timings})
+
+
+async def _stream_answer(request, answer, merged):
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+
+    async def send(payload):
+        await response.write((json.dumps(payload) + "\n").encode("utf-8"))
+
+    try:
+        async with asyncio.timeout(API_REQUEST_TIMEOUT):
+            async for kind, value in answer:
+                if kind == "token":
+                    await send({"token": value})
+                elif kind == "stats":
+                    await send({"done": True, "merged": merged, "timings": _timings(value)})
+    except TimeoutError:
+        await send({"error": f"no answer within {API_REQUEST_TIMEOUT:.0f}s"})
+    except ConnectionResetError:
+        # The caller went away; closing the answer lets the pipeline stop early
+        pass
+    except Exception as e:
+        await send({"error": str(e)})
+    finally:
+        await answer.aclose()
+    await response.write_eof()
+    return response
+
+
+def _timings(stats):
+    return {
+        key: round(stats[key], 3)
+        for key in ("retrieval", "time_to_first_token", "generation", "total")
+        if key in stats
+    }
+
+
+async def namespaces(request):
+    return web.json_response(catalog_namespaces(load_catalog()))
+
+
+async def health(request):
+    broker = request.app[BROKER_KEY]
+    return web.json_response({"in_flight": len(broker.runs), "waiting": broker.waiting, **broker.stats})
+
+
+async def metrics(request):
+    return web.Response(text=render_prometheus(), content_type="text/plain")
+
+
+async def _close_broker(app):
+    app[BROKER_KEY].shutdown()
+
+
+def create_app(broker=None):
+    """Build the aiohttp app; one broker (and the process-wide clients and caches) serves every request."""
+    app = web.Application()
+    app[BROKER_KEY] = broker or QuestionBroker()
+    app.router.add_post("/ask", ask)
+    app.router.add_get("/namespaces", namespaces)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    app.on_cleanup.append(_close_broker)
+    return app
+
+
+if __name__ == "__main__":
+    print(f"🚀 Serving questions on http://{API_HOST}:{API_PORT}/ask")
+    web.run_app(create_app(), host=API_HOST, port=API_PORT, print=None)
@@ -0,0 +1,100 @@
+# src/clickup/catalog.py
+import json
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from src.clickup.client import ClickUpClient
+from src.utils.helpers import get_data_dir
+
+load_dotenv()
+
+CATALOG_FILE = "namespace_catalog.json"
+# Seconds before the catalog is considered stale and refreshed from ClickUp
+CATALOG_TTL_SECONDS = int(os.getenv("NAMESPACE_CATALOG_TTL", "86400"))
+
+_lock = threading.Lock()
+
+
+def make_namespace(team_id, space_id):
+    return f"team-{team_id}-space-{space_id}"
+
+
+def _catalog_path():
+    return os.path.join(get_data_dir(), CATALOG_FILE)
+
+
+def load_catalog():
+    """Load the namespace catalog: {"refreshed_at": unix seconds or None, "namespaces": {namespace: entry}}."""
+    try:
+        with open(_catalog_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"refreshed_at": None, "namespaces": {}}
+
+
+def _save_catalog(catalog):
+    tmp_path = _catalog_path() + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2)
+    os.replace(tmp_path, _catalog_path())
+
+
+def is_catalog_fresh(catalog, ttl=CATALOG_TTL_SECONDS):
+    refreshed_at = catalog.get("refreshed_at")
+    return bool(refreshed_at) and time.time() - refreshed_at < ttl
+
+
+def update_namespace_entry(namespace, **fields):
+    """Merge fields (team/space names, vector_count, last_synced_at, ...) into a namespace's entry."""
+    with _lock:
+        catalog = load_catalog()
+        entry = catalog["namespaces"].setdefault(namespace, {"namespace": namespace})
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        _save_catalog(catalog)
+
+
+def catalog_namespaces(catalog):
+    """List catalog entries sorted by team and space name, in the shape get_all_namespaces returns."""
+    entries = [entry for entry in catalog["namespaces"].values() if entry.get("space_name")]
+    return sorted(entries, key=lambda e: (e.get("team_name", ""), e.get("space_name", "")))
+
+
+def refresh_catalog(client=None):
+    """Rebuild team/space entries from the live ClickUp API, keeping sync details of known namespaces."""
+    client = client or ClickUpClient()
+    live = {}
+    for team in client.get_teams().get("teams", []):
+        for space in client.get_spaces(team["id"]).get("spaces", []):
+            namespace = make_namespace(team["id"], space["id"])
+            live[namespace] = {
+                "namespace": namespace,
+                "team_id": team["id"],
+                "team_name": team["name"],
+                "space_id": space["id"],
+                "space_name": space["name"],
+            }
+
+    with _lock:
+        catalog = load_catalog()
+        # Spaces that no longer exist in ClickUp drop out of the catalog
+        catalog["namespaces"] = {
+            namespace: {**catalog["namespaces"].get(namespace, {}), **entry}
+            for namespace, entry in live.items()
+        }
+        catalog["refreshed_at"] = time.time()
+        _save_catalog(catalog)
+        return catalog
+
+
+def refresh_vector_counts(store=None):
+    """Cross-check catalog vector counts against the vector store's namespace stats."""
+    from src.vectorstore.client import get_vector_store
+
+    counts = (store or get_vector_store()).namespace_counts()
+    with _lock:
+        catalog = load_catalog()
+        for namespace, entry in catalog["namespaces"].items():
+            entry["vector_count"] = counts.get(namespace, 0)
+        _save_catalog(catalog)
+        return catalog
@@ -1,5 +1,68 @@
+import os
+import re
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from src.utils.helpers import load_env
+from src.utils.metrics import span
+from src.utils.rate_limit import TokenBucket
+
+CLICKUP_TIMEOUT = float(os.getenv("CLICKUP_TIMEOUT", "30"))
+CLICKUP_POOL_SIZE = int(os.getenv("CLICKUP_POOL_SIZE", "32"))
+CLICKUP_MAX_RETRIES = int(os.getenv("CLICKUP_MAX_RETRIES", "5"))
+# Requests per minute allowed until the server reports its own limit
+CLICKUP_RATE_LIMIT = int(os.getenv("CLICKUP_RATE_LIMIT", "100"))
+# Tasks returned per page by the list task endpoint
+CLICKUP_TASK_PAGE_SIZE = 100
+
+# One keep-alive session and one rate budget per API key, shared by every client in the process
+_session = None
+_rate_limiters = {}
+_shared_lock = threading.Lock()
+
+
+def get_session():
+    """Get the process-wide pooled HTTP session used for ClickUp requests."""
+    global _session
+    with _shared_lock:
+        if _session is None:
+            session = requests.Session()
+            # Transient server and connection errors are retried here; 429s are handled by ClickUpClient
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET"],
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=CLICKUP_POOL_SIZE, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_rate_limiter(api_key):
+    """Get the token bucket shared by all ClickUp clients using this API key."""
+    with _shared_lock:
+        if api_key not in _rate_limiters:
+            _rate_limiters[api_key] = TokenBucket(CLICKUP_RATE_LIMIT, period=60.0)
+        return _rate_limiters[api_key]
+
+
+def endpoint_label(path):
+    """Path with IDs replaced, e.g. "/task/{id}/comment", so metrics group by endpoint."""
+    return re.sub(r"/(team|space|folder|list|task|comment)/[^/]+", r"/\1/{id}", path)
+
+
+def _header_number(headers, name):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
 
 class ClickUpClient:
     def __init__(self):
@@ -10,55 +73,110 @@ class ClickUpClient:
             "Authorization": self.api_key,
             "Content-Type": "application/json"
         }
+        self.session = get_session()
+        self.rate_limiter = get_rate_limiter(self.api_key)
+
+    def _sync_rate_limit(self, response):
+        """Feed ClickUp's X-RateLimit-* headers back into the shared token bucket."""
+        limit = _header_number(response.headers, "X-RateLimit-Limit")
+        remaining = _header_number(response.headers, "X-RateLimit-Remaining")
+        reset_at = _header_number(response.headers, "X-RateLimit-Reset")
+        if limit is None and remaining is None:
+            return
+        self.rate_limiter.sync(
+            limit=int(limit) if limit else None,
+            remaining=int(remaining) if remaining is not None else None,
+            reset_at=reset_at,
+        )
+
+    @staticmethod
+    def _retry_delay(response, attempt):
+        retry_after = _header_number(response.headers, "Retry-After")
+        if retry_after is not None:
+            return retry_after
+        reset_at = _header_number(response.headers, "X-RateLimit-Reset")
+        if reset_at is not None:
+            return max(reset_at - time.time(), 1.0)
+        return min(2 ** attempt, 60)
+
+    def _get(self, path, params=None):
+        """GET a ClickUp endpoint, pacing requests by the shared rate budget.
+
+        Raises requests.HTTPError for non-2xx responses once retries are exhausted.
+        """
+        url = f"{self.base_url}{path}"
+        endpoint = endpoint_label(path)
+        for attempt in range(CLICKUP_MAX_RETRIES + 1):
+            self.rate_limiter.acquire()
+            with span("clickup_request", endpoint=endpoint) as s:
+                response = self.session.get(url, headers=self.headers, params=params, timeout=CLICKUP_TIMEOUT)
+                s["bytes"] = len(response.content)
+                s["rate_limited"] = int(response.status_code == 429)
+            self._sync_rate_limit(response)
+
+            if response.status_code == 429 and attempt < CLICKUP_MAX_RETRIES:
+                delay = self._retry_delay(response, attempt)
+                print(f"⏳ ClickUp rate limit hit on {path}, retrying in {delay:.1f}s")
+                self.rate_limiter.pause(delay)
+                continue
+
+            response.raise_for_status()
+            return response.json()
 
     def get_teams(self):
-        url = f"{self.base_url}/team"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        return self._get("/team")
 
     def get_spaces(self, team_id):
-        url = f"{self.base_url}/team/{team_id}/space"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        return self._get(f"/team/{team_id}/space")
 
     def get_folders(self, space_id):
-        url = f"{self.base_url}/space/{space_id}/folder"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        return self._get(f"/space/{space_id}/folder")
 
     def get_lists(self, folder_id):
-        url = f"{self.base_url}/folder/{folder_id}/list"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        return self._get(f"/folder/{folder_id}/list")
 
     def get_folderless_lists(self, space_id):
         # Lists not inside folders
-        url = f"{self.base_url}/space/{space_id}/list"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        return self._get(f"/space/{space_id}/list")
 
-    def get_tasks(self, list_id):
-        url = f"{self.base_url}/list/{list_id}/task"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+    def get_task(self, task_id):
+        # Includes the task's list, folder and space, and its team_id
+        return self._get(f"/task/{task_id}")
+
+    def task_exists(self, task_id):
+        """Whether a task still exists, whatever its status or archive state. Errors other than 404 are raised."""
+        try:
+            self.get_task(task_id)
+            return True
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return False
+            raise
+
+    def get_tasks(self, list_id, page=0, **params):
+        return self._get(f"/list/{list_id}/task", params={"page": page, **params})
+
+    def iter_tasks(self, list_id, **params):
+        """Yield every task in a list, fetching one page at a time."""
+        page = 0
+        while True:
+            response = self.get_tasks(list_id, page=page, **params)
+            tasks = response.get("tasks", [])
+            yield from tasks
+            # Older responses lack last_page; a short page is then the last one
+            last_page = response.get("last_page", len(tasks) < CLICKUP_TASK_PAGE_SIZE)
+            if not tasks or last_page:
+                return
+            page += 1
 
     def get_task_comments(self, task_id):
-        url = f"{self.base_url}/task/{task_id}/comment"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
-        
+        return self._get(f"/task/{task_id}/comment")
+
     def get_comment_thread(self, comment_id):
-        url = f"{self.base_url}/comment/{comment_id}/reply"
-        resp = requests.get(url, headers=self.headers)
-        resp.raise_for_status()
-        return resp.json().get("comments", [])     
+        return self._get(f"/comment/{comment_id}/reply").get("comments", [])
 
     def get_task_activity(self, task_id):
-        url = f"{self.base_url}/task/{task_id}/activity"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
-        
+        return self._get(f"/task/{task_id}/activity")
+
     def get_task_time_in_status(self, task_id):
-         url = f"{self.base_url}/task/{task_id}/time_in_status"
-         response = requests.get(url, headers=self.headers)
-         return response.json()
+        return self._get(f"/task/{task_id}/time_in_status")
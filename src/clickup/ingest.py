@@ -1,11 +1,22 @@
+from src.clickup.catalog import make_namespace
 from src.clickup.client import ClickUpClient
+from src.clickup.sync_state import get_watermark, set_watermark
 from src.rag.rag_pipeline import store_documents_openai
+from src.rag.reconcile import reconcile_namespace
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import os
 import tenacity
 import re
 from collections import Counter
 
 from src.utils.helpers  import date_to_milliseconds, to_human_readable_date
+from src.utils.metrics import span
+from src.utils.vocabulary import add_known_names
+
+# Worker threads used to fetch per-task comments, replies and activity
+CLICKUP_MAX_WORKERS = int(os.getenv("CLICKUP_MAX_WORKERS", "8"))
 
 def safe_int(value):
     try:
@@ -252,35 +263,65 @@ def build_clickup_docs(task, list_id, folder_id, space_id, comments=None, activi
     return docs
 
 
-def ingest_clickup_tasks(team_id, space_id, namespace="default"):
-    """Ingest ClickUp tasks, comments, and activity into Pinecone."""
-    client = ClickUpClient()
-    all_docs = []
-
-    # Retry decorator for API calls
-    @tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=tenacity.wait_fixed(2))
-    def get_replies(comment_id):
-        return client.get_comment_thread(comment_id)
-
-    def fetch_replies_for_comments(raw_comments):
-        """Fetch replies for each comment with retry logic."""
-        for c in raw_comments:
-            comment_id = c.get("id")
-            if comment_id:
-                try:
-                    replies = get_replies(comment_id)
-                    c["replies"] = [
-                        {
-                            "text": r.get("comment_text", ""),
-                            "date": r.get("date"),
-                            "user": r.get("user", {})
-                        }
-                        for r in replies if isinstance(r, dict) and r.get("comment_text", "").strip()
-                    ]
-                except Exception as reply_err:
-                    print(f"⚠️ Failed to fetch replies for comment {comment_id}: {str(reply_err)}")
-                    c["replies"] = []
-        return raw_comments
+# Retry decorator for API calls
+@tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=tenacity.wait_fixed(2))
+def get_replies(client, comment_id):
+    return client.get_comment_thread(comment_id)
+
+
+def fetch_replies_for_comments(client, raw_comments, request_pool):
+    """Fetch replies for each comment in parallel with retry logic."""
+    reply_futures = [
+        (c, request_pool.submit(get_replies, client, c.get("id")))
+        for c in raw_comments if c.get("id")
+    ]
+    for c, future in reply_futures:
+        try:
+            replies = future.result()
+            c["replies"] = [
+                {
+                    "text": r.get("comment_text", ""),
+                    "date": r.get("date"),
+                    "user": r.get("user", {})
+                }
+                for r in replies if isinstance(r, dict) and r.get("comment_text", "").strip()
+            ]
+        except Exception as reply_err:
+            print(f"⚠️ Failed to fetch replies for comment {c.get('id')}: {str(reply_err)}")
+            c["replies"] = []
+            c["replies_failed"] = True
+    return raw_comments
+
+
+def fetch_task_details(client, task, request_pool):
+    """Fetch comments (with replies) and activity for a task."""
+    activity_future = request_pool.submit(client.get_task_activity, task.get("id"))
+    raw_comments = client.get_task_comments(task.get("id")).get("comments", [])
+    raw_comments = fetch_replies_for_comments(client, raw_comments, request_pool)
+    activity = activity_future.result().get("activities", [])
+    return raw_comments, activity
+
+
+def iter_space_tasks(client, space_id, task_params=None, stats=None):
+    """Yield (task, list_id, folder_id, list_name, folder_name) for every task in a space, page by page.
+
+    task_params are passed to the list task endpoint, e.g. {"date_updated_gt": ms}.
+    Folder, list and task listing errors are counted in stats["crawl_errors"].
+    """
+    task_params = task_params or {}
+    stats = stats if stats is not None else {}
+    stats.setdefault("crawl_errors", 0)
+
+    def iter_list_tasks(list_id, list_name, label):
+        count = 0
+        try:
+            for task in client.iter_tasks(list_id, **task_params):
+                count += 1
+                yield task
+        except Exception as e:
+            print(f"❌ Error fetching tasks for list {list_id}: {str(e)}")
+            stats["crawl_errors"] += 1
+        print(f"📋 {label}: {list_name} ({list_id}) — {count} tasks")
 
     # Fetch folders
     try:
@@ -288,6 +329,7 @@ def ingest_clickup_tasks(team_id, space_id, namespace="default"):
         print(f"📁 Found {len(folders)} folders in space {space_id}")
     except Exception as e:
         print(f"❌ Error fetching folders for space {space_id}: {str(e)}")
+        stats["crawl_errors"] += 1
         folders = []
 
     if not folders:
@@ -302,37 +344,14 @@ def ingest_clickup_tasks(team_id, space_id, namespace="default"):
             print(f"📂 Folder: {folder_name} ({folder_id}) — {len(lists)} lists")
         except Exception as e:
             print(f"❌ Error fetching lists for folder {folder_id}: {str(e)}")
+            stats["crawl_errors"] += 1
             lists = []
 
         for lst in lists:
             list_id = lst.get("id")
             list_name = lst.get("name", "Unnamed List")
-            try:
-                tasks = client.get_tasks(list_id).get("tasks", [])
-                print(f"📋 List: {list_name} ({list_id}) — {len(tasks)} tasks")
-            except Exception as e:
-                print(f"❌ Error fetching tasks for list {list_id}: {str(e)}")
-                tasks = []
-
-            for task in tasks:
-                try:
-                    raw_comments = client.get_task_comments(task.get("id")).get("comments", [])
-                    raw_comments = fetch_replies_for_comments(raw_comments)
-                    activity = client.get_task_activity(task.get("id")).get("activities", [])
-                    docs = build_clickup_docs(
-                        task=task,
-                        list_id=list_id,
-                        folder_id=folder_id,
-                        space_id=space_id,
-                        comments=raw_comments,
-                        activity=activity,
-                        list_name=list_name,
-                        folder_name=folder_name,
-                        team_id=team_id
-                    )
-                    all_docs.extend(docs)
-                except Exception as e:
-                    print(f"❌ Error processing task {task.get('id', 'unknown')}: {str(e)}")
+            for task in iter_list_tasks(list_id, list_name, "List"):
+                yield task, list_id, folder_id, list_name, folder_name
 
     # Process folderless lists
     try:
@@ -340,42 +359,207 @@ def ingest_clickup_tasks(team_id, space_id, namespace="default"):
         print(f"📂 Folderless Lists Found: {len(folderless_lists)}")
     except Exception as e:
         print(f"❌ Error fetching folderless lists for space {space_id}: {str(e)}")
+        stats["crawl_errors"] += 1
         folderless_lists = []
 
     for lst in folderless_lists:
         list_id = lst.get("id")
         list_name = lst.get("name", "Unnamed List")
+        for task in iter_list_tasks(list_id, list_name, "List (No Folder)"):
+            yield task, list_id, None, list_name, None
+
+
+def iter_clickup_docs(team_id, space_id, client=None, max_workers=CLICKUP_MAX_WORKERS, task_params=None, stats=None):
+    """
+    Yield documents for every task in a space as soon as each task's details arrive.
+
+    Per-task comments, replies and activity are fetched concurrently by up to
+    max_workers threads, with a bounded number of tasks in flight so memory stays
+    flat. Docs are yielded in crawl order.
+
+    If a `stats` dict is given it is filled with "tasks", "task_ids",
+    "failed_tasks", "failed_replies", "crawl_errors" and "max_date_updated" (ms)
+    as the crawl progresses.
+    """
+    client = client or ClickUpClient()
+    stats = stats if stats is not None else {}
+    stats.update({
+        "tasks": 0,
+        "task_ids": set(),
+        "failed_tasks": 0,
+        "failed_replies": 0,
+        "crawl_errors": 0,
+        "max_date_updated": None,
+    })
+
+    # Tasks wait on their own comment/reply/activity requests, so the two
+    # pools are kept apart to avoid tasks starving their own requests.
+    task_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clickup-task")
+    request_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clickup-request")
+    max_in_flight = max_workers * 4
+    in_flight = deque()
+
+    def build_next():
+        future, (task, list_id, folder_id, list_name, folder_name) = in_flight.popleft()
+        stats["tasks"] += 1
+        stats["task_ids"].add(task.get("id", "unknown"))
+        updated_ms = safe_int(task.get("date_updated"))
+        if updated_ms and (stats["max_date_updated"] is None or updated_ms > stats["max_date_updated"]):
+            stats["max_date_updated"] = updated_ms
         try:
-            tasks = client.get_tasks(list_id).get("tasks", [])
-            print(f"📋 List (No Folder): {list_name} ({list_id}) — Found {len(tasks)} tasks")
-        except Exception as e:
-            print(f"❌ Error fetching tasks for list {list_id}: {str(e)}")
-            tasks = []
-
-        for task in tasks:
-            try:
-                raw_comments = client.get_task_comments(task.get("id")).get("comments", [])
-                raw_comments = fetch_replies_for_comments(raw_comments)
-                activity = client.get_task_activity(task.get("id")).get("activities", [])
+            raw_comments, activity = future.result()
+            stats["failed_replies"] += sum(1 for c in raw_comments if c.get("replies_failed"))
+            with span("doc_build") as s:
                 docs = build_clickup_docs(
                     task=task,
                     list_id=list_id,
-                    folder_id=None,
+                    folder_id=folder_id,
                     space_id=space_id,
                     comments=raw_comments,
                     activity=activity,
                     list_name=list_name,
-                    folder_name=None,
+                    folder_name=folder_name,
                     team_id=team_id
                 )
-                all_docs.extend(docs)
-            except Exception as e:
-                print(f"❌ Error processing task {task.get('id', 'unknown')}: {str(e)}")
+                s["items"] = len(docs)
+                s["bytes"] = sum(len(doc["content"].encode("utf-8")) for doc in docs)
+            return docs
+        except Exception as e:
+            print(f"❌ Error processing task {task.get('id', 'unknown')}: {str(e)}")
+            stats["failed_tasks"] += 1
+            return []
 
-    print(f"\n📦 Prepared {len(all_docs)} documents to store in namespace: {namespace}")
-    if all_docs:
-        store_documents_openai(all_docs, namespace=namespace)
-    else:
+    try:
+        for job in iter_space_tasks(client, space_id, task_params=task_params, stats=stats):
+            in_flight.append((task_pool.submit(fetch_task_details, client, job[0], request_pool), job))
+            if len(in_flight) >= max_in_flight:
+                yield from build_next()
+        while in_flight:
+            yield from build_next()
+    finally:
+        task_pool.shutdown(wait=True, cancel_futures=True)
+        request_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def collect_known_names(docs, assignees, projects):
+    """Pass docs through while collecting their assignee and project names."""
+    for doc in docs:
+        metadata = doc.get("metadata", {})
+        assignees.update(metadata.get("assignees", []))
+        if metadata.get("project") not in (None, "none"):
+            projects.add(metadata["project"])
+        yield doc
+
+
+def has_failures(summary):
+    """Whether an ingest summary records any lost data (crawl, task, reply or upsert failures)."""
+    return bool(
+        summary.get("failed")
+        or summary.get("failed_tasks")
+        or summary.get("failed_replies")
+        or summary.get("crawl_errors")
+    )
+
+
+def ingest_clickup_tasks(team_id, space_id, namespace="default", max_workers=CLICKUP_MAX_WORKERS, incremental=False, progress=None):
+    """Ingest ClickUp tasks, comments, and activity into Pinecone.
+
+    Docs are streamed from the crawl straight into batched embedding and upsert,
+    so the first vectors are stored while the crawl is still running.
+
+    With incremental=True only tasks updated since the namespace's last synced
+    date_updated watermark are crawled (and their comments, replies and activity).
+
+    Closed tasks are crawled too. After a run without failures, vectors the run did
+    not produce are deleted: across the whole namespace for a full run (vectors of
+    tasks the crawl did not see only once ClickUp confirms the task is gone), or for
+    the re-crawled tasks for an incremental one. The watermark is advanced at the
+    same time.
+
+    `progress` is passed to store_documents_openai and called after every stored chunk.
+    """
+    # The list task endpoint leaves closed tasks out unless asked; they are history worth keeping
+    task_params = {"include_closed": "true"}
+    watermark = get_watermark(namespace) if incremental else None
+    if watermark:
+        task_params["date_updated_gt"] = watermark
+        print(f"🔁 Incremental ingest of {namespace}: tasks updated after {to_human_readable_date(watermark)}")
+
+    crawl_stats = {}
+    assignees, projects = set(), set()
+    docs = iter_clickup_docs(team_id, space_id, max_workers=max_workers, task_params=task_params, stats=crawl_stats)
+    summary = store_documents_openai(collect_known_names(docs, assignees, projects), namespace=namespace, progress=progress)
+    summary.update(crawl_stats)
+    # Names let the local filter extractor answer without an LLM call
+    add_known_names(assignees=assignees, projects=projects)
+
+    print(f"\n📦 Stored {summary['upserted']} of {summary['docs']} documents from {summary['tasks']} tasks in namespace: {namespace}")
+    if not summary["docs"]:
         print("❌ No documents to store.")
 
-    return all_docs
\ No newline at end of file
+    # Only clean up and move the watermark forward when nothing was lost, so
+    # failures are retried next run and their old vectors are kept meanwhile
+    if has_failures(summary):
+        print(f"⚠️ Skipping cleanup and sync watermark for {namespace} because of failures")
+        return summary
+
+    summary["reconcile"] = reconcile_namespace(
+        namespace,
+        summary["ids"],
+        task_ids=summary["task_ids"] if watermark else None,
+        crawled_task_ids=summary["task_ids"],
+        task_exists=ClickUpClient().task_exists,
+    )
+    if summary["max_date_updated"] and summary["max_date_updated"] > (watermark or 0):
+        set_watermark(namespace, summary["max_date_updated"])
+
+    return summary
+
+
+def reindex_task(task_id, client=None, max_workers=4):
+    """
+    Rebuild and re-store the docs of a single task, then delete its vectors the rebuild did not produce.
+
+    Used by the webhook service so a task change is searchable within seconds.
+    Returns the store summary plus "namespace" and, when nothing failed, "reconcile".
+    """
+    client = client or ClickUpClient()
+    task = client.get_task(task_id)
+    team_id = task.get("team_id")
+    space_id = (task.get("space") or {}).get("id")
+    namespace = make_namespace(team_id, space_id)
+    lst = task.get("list") or {}
+    folder = task.get("folder") or {}
+    # Lists outside folders belong to a hidden folder
+    folder_id = None if folder.get("hidden") else folder.get("id")
+    folder_name = None if folder.get("hidden") else folder.get("name")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clickup-request") as request_pool:
+        raw_comments, activity = fetch_task_details(client, task, request_pool)
+    with span("doc_build") as s:
+        docs = build_clickup_docs(
+            task=task,
+            list_id=lst.get("id"),
+            folder_id=folder_id,
+            space_id=space_id,
+            comments=raw_comments,
+            activity=activity,
+            list_name=lst.get("name"),
+            folder_name=folder_name,
+            team_id=team_id
+        )
+        s["items"] = len(docs)
+
+    assignees, projects = set(), set()
+    summary = store_documents_openai(collect_known_names(docs, assignees, projects), namespace=namespace)
+    add_known_names(assignees=assignees, projects=projects)
+    summary["namespace"] = namespace
+    summary["failed_replies"] = sum(1 for c in raw_comments if c.get("replies_failed"))
+    print(f"🔄 Re-indexed task {task_id}: {summary['upserted']} of {summary['docs']} docs in {namespace}")
+
+    # Keep the old vectors if anything is missing from the rebuild
+    if has_failures(summary):
+        print(f"⚠️ Keeping old vectors of task {task_id} because of failures")
+        return summary
+    summary["reconcile"] = reconcile_namespace(namespace, summary["ids"], task_ids={task_id})
+    return summary
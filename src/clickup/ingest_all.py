@@ -1,7 +1,98 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from src.clickup.catalog import make_namespace, update_namespace_entry
 from src.clickup.client import ClickUpClient
-from src.clickup.ingest import ingest_clickup_tasks
+from src.clickup.ingest import has_failures, ingest_clickup_tasks
 
-def ingest_all_clickup_data():
+# Spaces ingested at the same time; they share the process-wide ClickUp and embedding budgets
+INGEST_SPACE_WORKERS = int(os.getenv("INGEST_SPACE_WORKERS", "3"))
+# Extra attempts for spaces that failed during the main pass
+INGEST_SPACE_RETRIES = int(os.getenv("INGEST_SPACE_RETRIES", "1"))
+# Seconds between progress reports
+INGEST_PROGRESS_INTERVAL = float(os.getenv("INGEST_PROGRESS_INTERVAL", "15"))
+
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class IngestProgress:
+    """
+    Thread-safe per-space progress, throughput and ETA tracking for a multi-space ingest.
+
+    Spaces are keyed by namespace, which is unique across teams; their names are only labels.
+    """
+
+    def __init__(self, total_spaces):
+        self.total_spaces = total_spaces
+        self.started = time.monotonic()
+        self.spaces = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reporter = None
+
+    def start_space(self, namespace, label):
+        with self._lock:
+            self.spaces[namespace] = {"label": label, "started": time.monotonic(), "finished": None, "docs": 0, "ok": None}
+
+    def update_space(self, namespace, summary):
+        with self._lock:
+            self.spaces[namespace]["docs"] = summary["upserted"]
+
+    def finish_space(self, namespace, ok):
+        with self._lock:
+            self.spaces[namespace]["finished"] = time.monotonic()
+            self.spaces[namespace]["ok"] = ok
+
+    def report(self):
+        with self._lock:
+            now = time.monotonic()
+            finished = [s for s in self.spaces.values() if s["finished"] is not None]
+            running = [s for s in self.spaces.values() if s["finished"] is None]
+            total_docs = sum(s["docs"] for s in self.spaces.values())
+            elapsed = now - self.started
+
+            lines = [
+                f"📊 {len(finished)}/{self.total_spaces} spaces done, {total_docs} docs stored "
+                f"({total_docs / elapsed if elapsed else 0:.1f} docs/s) in {_format_duration(elapsed)}"
+            ]
+            for s in running:
+                space_elapsed = now - s["started"]
+                rate = s["docs"] / space_elapsed if space_elapsed else 0
+                lines.append(f"   ⏳ {s['label']}: {s['docs']} docs ({rate:.1f} docs/s)")
+
+            if finished and len(finished) < self.total_spaces:
+                # Spaces complete at roughly the observed rate of completions so far
+                eta = elapsed / len(finished) * (self.total_spaces - len(finished))
+                lines.append(f"   ETA ~{_format_duration(eta)}")
+        print("\n".join(lines))
+
+    def start_reporting(self, interval=INGEST_PROGRESS_INTERVAL):
+        def loop():
+            while not self._stop.wait(interval):
+                self.report()
+
+        self._reporter = threading.Thread(target=loop, name="ingest-progress", daemon=True)
+        self._reporter.start()
+
+    def stop_reporting(self):
+        self._stop.set()
+        if self._reporter:
+            self._reporter.join()
+
+
+def ingest_all_clickup_data(incremental=False, max_spaces=INGEST_SPACE_WORKERS):
+    """Ingest every space of every team, each into its own namespace.
+
+    Up to max_spaces spaces are ingested in parallel. Spaces that fail are retried
+    after the main pass. With incremental=True each space only re-ingests tasks
+    updated since its last sync.
+    """
     client = ClickUpClient()
 
     teams = client.get_teams().get("teams", [])
@@ -9,6 +100,7 @@ def ingest_all_clickup_data():
         print("❌ No teams found.")
         return
 
+    jobs = []
     for team in teams:
         team_id = team["id"]
         team_name = team["name"]
@@ -20,16 +112,68 @@ def ingest_all_clickup_data():
             continue
 
         for space in spaces:
-            space_id = space["id"]
-            space_name = space["name"]
-            print(f"\n📦 Ingesting Space: {space_name} ({space_id})")
+            jobs.append((team_id, team_name, space["id"], space["name"]))
+
+    progress = IngestProgress(len(jobs))
+
+    def ingest_space(team_id, team_name, space_id, space_name):
+        namespace = make_namespace(team_id, space_id)
+        print(f"\n📦 Ingesting Space: {space_name} ({space_id})")
+        progress.start_space(namespace, f"{team_name} / {space_name}")
+        try:
+            summary = ingest_clickup_tasks(
+                team_id,
+                space_id,
+                namespace=namespace,
+                incremental=incremental,
+                progress=lambda s: progress.update_space(namespace, s),
+            )
+        except Exception as e:
+            print(f"❌ Error while processing space {space_name}: {str(e)}")
+            progress.finish_space(namespace, ok=False)
+            return False
+
+        ok = not has_failures(summary)
+        progress.finish_space(namespace, ok=ok)
+        update_namespace_entry(
+            namespace,
+            team_id=team_id,
+            team_name=team_name,
+            space_id=space_id,
+            space_name=space_name,
+            # Only a full-namespace reconcile knows the exact vector count
+            vector_count=summary["reconcile"]["after"] if ok and not incremental else None,
+            last_synced_at=datetime.now().isoformat(timespec="seconds") if ok else None,
+        )
+        if ok:
+            print(f"✅ Finished storing tasks in namespace: {namespace}")
+        else:
+            print(f"⚠️ Space {space_name} finished with failures")
+        return ok
+
+    def run_pass(pass_jobs):
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_spaces, thread_name_prefix="ingest-space") as executor:
+            futures = {executor.submit(ingest_space, *job): job for job in pass_jobs}
+            for future in as_completed(futures):
+                if not future.result():
+                    failed.append(futures[future])
+        return failed
+
+    progress.start_reporting()
+    try:
+        failed = run_pass(jobs)
+        for attempt in range(INGEST_SPACE_RETRIES):
+            if not failed:
+                break
+            print(f"\n🔁 Retrying {len(failed)} failed spaces (attempt {attempt + 1})")
+            failed = run_pass(failed)
+    finally:
+        progress.stop_reporting()
 
-            namespace = f"team-{team_id}-space-{space_id}"
-            try:
-                ingest_clickup_tasks(team_id, space_id, namespace=namespace)
-                print(f"✅ Finished storing tasks in namespace: {namespace}")
-            except Exception as e:
-                print(f"❌ Error while processing space {space_name}: {str(e)}")
+    progress.report()
+    if failed:
+        print(f"❌ Spaces still failing: {', '.join(job[-1] for job in failed)}")
 
 # if __name__ == "__main__":
-#     ingest_all_clickup_data()
\ No newline at end of file
+#     ingest_all_clickup_data()
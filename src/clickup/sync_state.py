@@ -0,0 +1,43 @@
+# src/clickup/sync_state.py
+import json
+import os
+import threading
+from datetime import datetime
+from src.utils.helpers import get_data_dir
+
+SYNC_STATE_FILE = "sync_state.json"
+
+_lock = threading.Lock()
+
+
+def _state_path():
+    return os.path.join(get_data_dir(), SYNC_STATE_FILE)
+
+
+def load_sync_state():
+    """Load the per-namespace sync state, or an empty dict if nothing was synced yet."""
+    try:
+        with open(_state_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def get_watermark(namespace):
+    """Return the last synced task date_updated (ms) for a namespace, or None."""
+    return load_sync_state().get(namespace, {}).get("date_updated")
+
+
+def set_watermark(namespace, date_updated_ms):
+    """Record the newest task date_updated (ms) that has been stored for a namespace."""
+    with _lock:
+        state = load_sync_state()
+        state[namespace] = {
+            "date_updated": int(date_updated_ms),
+            "synced_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        # Write to a temp file first so a crash never leaves a half-written state file
+        tmp_path = _state_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, _state_path())
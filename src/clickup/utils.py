@@ -1,25 +1,10 @@
 # src/clickup/utils.py
-from src.clickup.client import ClickUpClient
+from src.clickup.catalog import catalog_namespaces, is_catalog_fresh, load_catalog, refresh_catalog
 
-def get_all_namespaces():
-    client = ClickUpClient()
-    namespaces = []
 
-    teams = client.get_teams().get("teams", [])
-    for team in teams:
-        team_id = team["id"]
-        team_name = team["name"]
-
-        spaces = client.get_spaces(team_id).get("spaces", [])
-        for space in spaces:
-            space_id = space["id"]
-            space_name = space["name"]
-
-            namespace = f"team-{team_id}-space-{space_id}"
-            namespaces.append({
-                "team_name": team_name,
-                "space_name": space_name,
-                "namespace": namespace
-            })
-
-    return namespaces
+def get_all_namespaces(use_catalog=True):
+    """List every team/space namespace, from the local catalog while it is fresh, else from ClickUp."""
+    catalog = load_catalog()
+    if not (use_catalog and is_catalog_fresh(catalog)):
+        catalog = refresh_catalog()
+    return catalog_namespaces(catalog)
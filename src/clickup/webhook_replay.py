@@ -0,0 +1,72 @@
+# src/clickup/webhook_replay.py
+"""
+Replay recorded ClickUp webhook events against a local webhook server.
+
+Events are read from a JSON lines file, one webhook payload per line, e.g.
+    {"event": "taskCommentPosted", "task_id": "86abc", "webhook_id": "..."}
+An optional "delay" field (seconds) waits before that event is sent.
+
+    python -m src.clickup.webhook_replay events.jsonl
+    python -m src.clickup.webhook_replay --task-id 86abc --burst 5
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import time
+import urllib.error
+import urllib.request
+from src.clickup.webhook_server import CLICKUP_WEBHOOK_PATH, CLICKUP_WEBHOOK_PORT, CLICKUP_WEBHOOK_SECRET
+
+
+def send_event(url, payload, secret=CLICKUP_WEBHOOK_SECRET):
+    """POST one webhook payload, signed like ClickUp does when a secret is set. Returns (status, body)."""
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-Signature"] = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def load_events(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def burst_events(task_id, count):
+    """A typical editing burst: several updates and a comment on one task."""
+    kinds = ["taskUpdated", "taskStatusUpdated", "taskCommentPosted", "taskAssigneeUpdated"]
+    return [{"event": kinds[i % len(kinds)], "task_id": task_id, "delay": 0.2} for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay ClickUp webhook events to a local server.")
+    parser.add_argument("events", nargs="?", help="JSON lines file of recorded webhook payloads")
+    parser.add_argument("--task-id", help="Send a synthetic burst of events for this task instead")
+    parser.add_argument("--burst", type=int, default=5, help="Number of events in a synthetic burst")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{CLICKUP_WEBHOOK_PORT}{CLICKUP_WEBHOOK_PATH}")
+    parser.add_argument("--speed", type=float, default=1.0, help="Divide recorded delays by this factor")
+    args = parser.parse_args()
+
+    if args.task_id:
+        events = burst_events(args.task_id, args.burst)
+    elif args.events:
+        events = load_events(args.events)
+    else:
+        parser.error("give an events file or --task-id")
+
+    for payload in events:
+        delay = payload.pop("delay", 0) / args.speed
+        if delay:
+            time.sleep(delay)
+        status, body = send_event(args.url, payload)
+        print(f"📨 {payload.get('event')} {payload.get('task_id')} → {status} {body}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# src/clickup/webhook_server.py
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from src.clickup.catalog import catalog_namespaces, load_catalog, update_namespace_entry
+from src.clickup.client import ClickUpClient
+from src.clickup.ingest import reindex_task
+from src.rag.reconcile import delete_task_vectors
+from src.utils.metrics import span
+
+load_dotenv()
+
+CLICKUP_WEBHOOK_HOST = os.getenv("CLICKUP_WEBHOOK_HOST", "0.0.0.0")
+CLICKUP_WEBHOOK_PORT = int(os.getenv("CLICKUP_WEBHOOK_PORT", "8787"))
+CLICKUP_WEBHOOK_PATH = os.getenv("CLICKUP_WEBHOOK_PATH", "/clickup/webhook")
+# Secret returned by ClickUp when the webhook was created; enables X-Signature checks
+CLICKUP_WEBHOOK_SECRET = os.getenv("CLICKUP_WEBHOOK_SECRET")
+# Quiet period after a task's last event before it is re-indexed
+WEBHOOK_DEBOUNCE_SECONDS = float(os.getenv("WEBHOOK_DEBOUNCE_SECONDS", "2"))
+# Upper bound on how long a task with a steady stream of events waits
+WEBHOOK_MAX_DELAY_SECONDS = float(os.getenv("WEBHOOK_MAX_DELAY_SECONDS", "10"))
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+# A failed re-index is retried after 5s, 10s, 20s, ... (capped) before the task is given up on
+WEBHOOK_RETRY_BASE_SECONDS = float(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "5"))
+WEBHOOK_RETRY_MAX_SECONDS = float(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "300"))
+WEBHOOK_MAX_RETRIES = int(os.getenv("WEBHOOK_MAX_RETRIES", "5"))
+
+# Events that change what a task's docs contain
+TASK_EVENTS = {
+    "taskCreated",
+    "taskUpdated",
+    "taskDeleted",
+    "taskPriorityUpdated",
+    "taskStatusUpdated",
+    "taskAssigneeUpdated",
+    "taskDueDateUpdated",
+    "taskTagUpdated",
+    "taskMoved",
+    "taskCommentPosted",
+    "taskCommentUpdated",
+    "taskTimeEstimateUpdated",
+    "taskTimeTrackedUpdated",
+}
+
+
+def verify_signature(body, signature, secret=CLICKUP_WEBHOOK_SECRET):
+    """Check ClickUp's X-Signature header (hex HMAC-SHA256 of the raw body). Always true without a secret."""
+    if not secret:
+        return True
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return bool(signature) and hmac.compare_digest(expected, signature)
+
+
+class TaskDebouncer:
+    """
+    Merge bursts of events per task and hand each task to `handler(task_id, events)` once things go quiet.
+
+    A task is flushed `delay` seconds after its last event, or `max_delay` seconds after its
+    first one, whichever comes first. A task is never handled by two workers at once;
+    events arriving while it is being handled schedule another run afterwards. A failed
+    run is queued again with exponential backoff, up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        handler,
+        delay=WEBHOOK_DEBOUNCE_SECONDS,
+        max_delay=WEBHOOK_MAX_DELAY_SECONDS,
+        workers=WEBHOOK_WORKERS,
+        retry_base=WEBHOOK_RETRY_BASE_SECONDS,
+        retry_max=WEBHOOK_RETRY_MAX_SECONDS,
+        max_retries=WEBHOOK_MAX_RETRIES,
+    ):
+        self.handler = handler
+        self.delay = delay
+        self.max_delay = max_delay
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_retries = max_retries
+        self.pending = {}
+        self.running = set()
+        self.stats = {"events": 0, "runs": 0, "retries": 0, "failures": 0}
+        self._condition = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webhook-reindex")
+        self._stopped = False
+        self._thread = threading.Thread(target=self._loop, name="webhook-debouncer", daemon=True)
+        self._thread.start()
+
+    def submit(self, task_id, event):
+        now = time.monotonic()
+        with self._condition:
+            self.stats["events"] += 1
+            entry = self.pending.setdefault(task_id, {"first_seen": now, "events": set()})
+            entry["last_seen"] = now
+            entry["events"].add(event)
+            self._condition.notify()
+
+    def _due_at(self, entry):
+        due = min(entry["last_seen"] + self.delay, entry["first_seen"] + self.max_delay)
+        return max(due, entry.get("retry_at", due))
+
+    def _loop(self):
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                waiting = [(task_id, entry) for task_id, entry in self.pending.items() if task_id not in self.running]
+                for task_id, entry in waiting:
+                    if self._due_at(entry) <= now:
+                        del self.pending[task_id]
+                        self.running.add(task_id)
+                        self._pool.submit(self._run, task_id, entry["events"], entry.get("attempt", 0))
+                due = [self._due_at(entry) for task_id, entry in self.pending.items() if task_id not in self.running]
+                self._condition.wait(timeout=max(min(due) - now, 0.01) if due else None)
+
+    def _run(self, task_id, events, attempt=0):
+        failed = False
+        try:
+            self.handler(task_id, events)
+        except Exception as e:
+            failed = True
+            print(f"❌ Re-indexing task {task_id} failed (attempt {attempt + 1}): {e}")
+        finally:
+            with self._condition:
+                if not failed:
+                    self.stats["runs"] += 1
+                elif attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    self._requeue(task_id, events, attempt + 1)
+                else:
+                    self.stats["failures"] += 1
+                    print(f"❌ Giving up on task {task_id} after {attempt + 1} attempts")
+                self.running.discard(task_id)
+                self._condition.notify()
+
+    def _requeue(self, task_id, events, attempt):
+        """Queue a failed task again, merged with any events that arrived meanwhile. Caller holds the lock."""
+        now = time.monotonic()
+        entry = self.pending.setdefault(task_id, {"first_seen": now, "last_seen": now, "events": set()})
+        entry["events"] |= events
+        entry["attempt"] = attempt
+        entry["retry_at"] = now + min(self.retry_base * 2 ** (attempt - 1), self.retry_max)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._pool.shutdown(wait=True)
+
+
+def handle_task_events(task_id, events, client=None):
+    """Bring one task's vectors up to date after a merged burst of webhook events."""
+    namespaces = [entry["namespace"] for entry in catalog_namespaces(load_catalog())]
+    with span("webhook_reindex", deleted=str("taskDeleted" in events).lower()):
+        if "taskDeleted" in events:
+            delete_task_vectors(task_id, namespaces)
+            return
+
+        summary = reindex_task(task_id, client=client)
+        if "taskMoved" in events:
+            # A task moved to another space leaves its old vectors behind
+            delete_task_vectors(task_id, namespaces, keep_namespace=summary["namespace"])
+        update_namespace_entry(summary["namespace"], last_synced_at=datetime.now().isoformat(timespec="seconds"))
+
+
+def make_handler(debouncer):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._reply(404, {"error": "not found"})
+                return
+            with debouncer._condition:
+                health = {"pending": len(debouncer.pending), "running": len(debouncer.running), **debouncer.stats}
+            self._reply(200, health)
+
+        def do_POST(self):
+            if self.path != CLICKUP_WEBHOOK_PATH:
+                self._reply(404, {"error": "not found"})
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if not verify_signature(body, self.headers.get("X-Signature")):
+                self._reply(401, {"error": "invalid signature"})
+                return
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError:
+                self._reply(400, {"error": "invalid JSON"})
+                return
+            if not isinstance(payload, dict):
+                self._reply(400, {"error": "body must be a JSON object"})
+                return
+
+            event, task_id = payload.get("event"), payload.get("task_id")
+            if event in TASK_EVENTS and task_id:
+                debouncer.submit(str(task_id), event)
+                self._reply(202, {"queued": task_id})
+            else:
+                # Acknowledge anything else so ClickUp does not retry or disable the webhook
+                self._reply(200, {"ignored": event})
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+
+def run_webhook_server(host=CLICKUP_WEBHOOK_HOST, port=CLICKUP_WEBHOOK_PORT):
+    """Serve ClickUp webhooks until interrupted, re-indexing changed tasks in the background."""
+    client = ClickUpClient()
+    debouncer = TaskDebouncer(lambda task_id, events: handle_task_events(task_id, events, client=client))
+    server = ThreadingHTTPServer((host, port), make_handler(debouncer))
+    if not CLICKUP_WEBHOOK_SECRET:
+        print("⚠️ CLICKUP_WEBHOOK_SECRET is not set; webhook signatures are not checked")
+    print(f"🪝 Listening for ClickUp webhooks on http://{host}:{port}{CLICKUP_WEBHOOK_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping webhook server")
+    finally:
+        server.server_close()
+        debouncer.stop()
+
+
+if __name__ == "__main__":
+    run_webhook_server()
@@ -2,7 +2,19 @@ import os
 from dotenv import load_dotenv
 import openai
 import json
+import copy
+import threading
+import tiktoken
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
+from src.openai.embedding_cache import get_embedding_cache
+from src.openai.filter_rules import extract_filters_locally, normalize_question
+from src.utils.adaptive_limiter import get_adaptive_limiter
+from src.utils.metrics import span, submit_with_context
+from src.utils.rate_limit import TokenBucket
+from src.utils.vocabulary import load_known_names, vocabulary_version
 
 
 
@@ -11,17 +23,170 @@ load_dotenv()
 
 client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# Per-input and per-request limits of the embeddings endpoint
+EMBEDDING_MAX_INPUT_TOKENS = 8191
+EMBEDDING_MAX_BATCH_INPUTS = int(os.getenv("OPENAI_EMBED_BATCH_INPUTS", "2048"))
+EMBEDDING_MAX_BATCH_TOKENS = int(os.getenv("OPENAI_EMBED_BATCH_TOKENS", "300000"))
+# Account-level embedding quota shared by every thread in the process
+EMBEDDING_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_EMBED_TPM", "1000000"))
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_EMBED_RPM", "3000"))
+
+embedding_token_budget = TokenBucket(EMBEDDING_TOKENS_PER_MINUTE, period=60.0)
+embedding_request_budget = TokenBucket(EMBEDDING_REQUESTS_PER_MINUTE, period=60.0)
+# Embedding requests in flight adapt between 1 and this many based on 429s, errors and latency
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("OPENAI_EMBED_MAX_CONCURRENCY", "16"))
+embedding_limiter = get_adaptive_limiter("openai_embeddings", initial=4, maximum=EMBEDDING_MAX_CONCURRENCY)
+# Sends the requests of one embed call side by side; the limiter decides how many actually run
+_embed_pool = ThreadPoolExecutor(max_workers=EMBEDDING_MAX_CONCURRENCY, thread_name_prefix="openai-embed")
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model=EMBEDDING_MODEL):
+    """Get the tiktoken encoding used by an OpenAI model."""
+    return tiktoken.encoding_for_model(model)
+
+
+def fit_to_token_limit(text, max_tokens=EMBEDDING_MAX_INPUT_TOKENS, model=EMBEDDING_MODEL):
+    """Truncate text to the model's per-input token limit. Returns (text, token_count)."""
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text, len(tokens)
+    print(f"⚠️ Truncating embedding input from {len(tokens)} to {max_tokens} tokens")
+    return encoding.decode(tokens[:max_tokens]), max_tokens
+
+
+def batch_by_tokens(token_counts, max_inputs=EMBEDDING_MAX_BATCH_INPUTS, max_tokens=EMBEDDING_MAX_BATCH_TOKENS):
+    """Group input positions into batches capped by input count and total tokens."""
+    batch, batch_tokens = [], 0
+    for i, count in enumerate(token_counts):
+        if batch and (len(batch) >= max_inputs or batch_tokens + count > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += count
+    if batch:
+        yield batch
+
+
 def get_embedder():
     """Get Open AI embeddings model."""
-    return lambda text: client.embeddings.create(input=text, model="text-embedding-ada-002").data[0].embedding
+    embed_batch = get_batch_embedder()
+    return lambda text: embed_batch([text])[0]
+
+
+def get_batch_embedder():
+    """Get Open AI embeddings model that embeds a list of texts with as few requests as possible.
+
+    The returned callable takes a list of strings and returns their embeddings in the same order.
+    Texts already in the local embedding cache are not sent to OpenAI. When the texts
+    need several requests they are sent concurrently, as far as the shared adaptive
+    limiter allows.
+    """
+    def embed_request(inputs, batch_tokens):
+        embedding_request_budget.acquire()
+        embedding_token_budget.acquire(min(batch_tokens, EMBEDDING_TOKENS_PER_MINUTE))
+        with span("embed", model=EMBEDDING_MODEL) as s:
+            s["items"] = len(inputs)
+            s["bytes"] = sum(len(text.encode("utf-8")) for text in inputs)
+            # The limiter retries 429s, timeouts, 5xx and connection errors itself, so the SDK must not hide them
+            response = embedding_limiter.call(
+                client.with_options(max_retries=0).embeddings.create,
+                input=inputs,
+                model=EMBEDDING_MODEL,
+            )
+            usage = getattr(response, "usage", None)
+            s["prompt_tokens"] = getattr(usage, "prompt_tokens", None) or batch_tokens
+        return response
+
+    def embed_batch(texts):
+        texts = list(texts)
+        cache = get_embedding_cache()
+        with span("embedding_cache") as s:
+            embeddings = cache.get_many(texts, EMBEDDING_MODEL) if cache else [None] * len(texts)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            s["items"] = len(texts)
+            s["hits"] = len(texts) - len(missing)
+        if not missing:
+            return embeddings
+
+        prepared = [fit_to_token_limit(texts[i]) for i in missing]
+        jobs = [
+            (batch, [prepared[i][0] for i in batch], sum(prepared[i][1] for i in batch))
+            for batch in batch_by_tokens([count for _, count in prepared])
+        ]
+        if len(jobs) == 1:
+            responses = [embed_request(*jobs[0][1:])]
+        else:
+            futures = [submit_with_context(_embed_pool, embed_request, inputs, tokens) for _, inputs, tokens in jobs]
+            try:
+                responses = [future.result() for future in futures]
+            finally:
+                for future in futures:
+                    future.cancel()
+        for (batch, _, _), response in zip(jobs, responses):
+            # Results carry the position of their input within the request
+            for item in response.data:
+                embeddings[missing[batch[item.index]]] = item.embedding
+
+        if cache:
+            cache.put_many([texts[i] for i in missing], [embeddings[i] for i in missing], EMBEDDING_MODEL)
+        return embeddings
+
+    return embed_batch
+
+
+# Memoized filter extractions keyed by (normalized question, local date, vocabulary version)
+FILTER_CACHE_SIZE = 1024
+_filter_cache = OrderedDict()
+_filter_cache_lock = threading.Lock()
+
+
+def _record_usage(s, usage):
+    """Copy token usage reported by OpenAI into a metrics span."""
+    if usage is not None:
+        s["prompt_tokens"] = getattr(usage, "prompt_tokens", 0) or 0
+        s["completion_tokens"] = getattr(usage, "completion_tokens", 0) or 0
+
 
 def get_llm():
     """Get Open AI chat model."""
-    return lambda messages: client.chat.completions.create(
-        model="gpt-4",
-        messages=messages,
-        temperature=0
-    ).choices[0].message.content
+    def complete(messages):
+        with span("llm_generation", model="gpt-4", mode="blocking") as s:
+            response = client.chat.completions.create(
+                model="gpt-4",
+                messages=messages,
+                temperature=0
+            )
+            answer = response.choices[0].message.content
+            _record_usage(s, getattr(response, "usage", None))
+            s["bytes"] = len((answer or "").encode("utf-8"))
+            return answer
+
+    return complete
+
+
+def get_streaming_llm():
+    """Get Open AI chat model that yields the answer in pieces as it is generated."""
+    def stream(messages):
+        with span("llm_generation", model="gpt-4", mode="stream") as s:
+            response = client.chat.completions.create(
+                model="gpt-4",
+                messages=messages,
+                temperature=0,
+                stream=True,
+                # The last chunk then carries the token usage of the whole answer
+                stream_options={"include_usage": True},
+            )
+            s["bytes"] = 0
+            for chunk in response:
+                _record_usage(s, getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    s["bytes"] += len(chunk.choices[0].delta.content.encode("utf-8"))
+                    yield chunk.choices[0].delta.content
+
+    return stream
 
 
 
@@ -33,11 +198,46 @@ def extract_filters_from_question(question: str) -> dict:
     """
     Extracts metadata and date filters from a natural language question.
     Uses local timezone and ensures full-day date ranges (00:00:00 to 23:59:59).
+
+    Common question shapes are handled by local rules; the LLM is only called when
+    they are not confident. Results are memoized per normalized question and date,
+    and recomputed once ingest adds assignee or project names.
     """
-    # Get local timezone date
-    local_tz = datetime.now().astimezone().tzinfo
-    today_str = datetime.now(local_tz).strftime("%Y-%m-%d")
+    with span("filter_extraction") as s:
+        # Get local timezone date
+        local_tz = datetime.now().astimezone().tzinfo
+        today = datetime.now(local_tz).date()
+        today_str = today.strftime("%Y-%m-%d")
+
+        cache_key = (normalize_question(question), today_str, vocabulary_version())
+        with _filter_cache_lock:
+            if cache_key in _filter_cache:
+                _filter_cache.move_to_end(cache_key)
+                s["cache_hits"] = 1
+                return copy.deepcopy(_filter_cache[cache_key])
+
+        known = load_known_names()
+        filters, confident = extract_filters_locally(
+            question,
+            today=today,
+            known_assignees=known["assignees"],
+            known_projects=known["projects"],
+        )
+        if not confident:
+            s["llm_calls"] = 1
+            filters = _extract_filters_with_llm(question, today_str)
+            if filters is None:
+                return {}
+
+        with _filter_cache_lock:
+            _filter_cache[cache_key] = filters
+            if len(_filter_cache) > FILTER_CACHE_SIZE:
+                _filter_cache.popitem(last=False)
+        return copy.deepcopy(filters)
+
 
+def _extract_filters_with_llm(question, today_str):
+    """Ask GPT-4 for the filters in a question. Returns None if the reply is not valid JSON."""
     system_prompt = f"""
 You are an assistant that extracts structured metadata filters from natural language questions.
 Today's date is {today_str} (local timezone).
@@ -91,17 +291,19 @@ A:
 }}
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": question}
-        ],
-        temperature=0.2
-    )
+    with span("llm_filter_extraction", model="gpt-4") as s:
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": question}
+            ],
+            temperature=0.2
+        )
+        _record_usage(s, getattr(response, "usage", None))
 
     try:
         return json.loads(response.choices[0].message.content.strip())
     except Exception as e:
         print("Error parsing filter JSON:", e)
-        return {}
+        return None
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from dotenv import load_dotenv
+from src.utils.helpers import get_data_dir
+
+load_dotenv()
+
+EMBEDDING_CACHE_FILE = "embedding_cache.sqlite3"
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+# ~6KB per ada-002 vector, so the default holds roughly 600MB of embeddings
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by content hash + model name.
+
+    Vectors are stored as float32 blobs in SQLite. Every hit refreshes the entry's
+    last-used time and the least recently used entries are evicted once the cache
+    grows past max_entries.
+    """
+
+    def __init__(self, path=None, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path or os.path.join(get_data_dir(), EMBEDDING_CACHE_FILE)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(text, model):
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts, model):
+        """Return cached embeddings for texts in order, with None for misses."""
+        keys = [self.make_key(text, model) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                        [time.time(), *chunk],
+                    )
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts, embeddings, model):
+        """Store embeddings for texts, evicting least recently used entries past the size limit."""
+        now = time.time()
+        rows = [
+            (self.make_key(text, model), model, array("f", embedding).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+            self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if self._count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (self._count - self.max_entries,),
+                )
+                self._count = self.max_entries
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Get the process-wide embedding cache, or None when caching is disabled."""
+    global _cache
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
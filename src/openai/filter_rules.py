@@ -0,0 +1,158 @@
+import re
+from datetime import datetime, timedelta
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december",
+]
+
+# Date phrases the rules below cannot resolve; any of these sends the question to the LLM
+UNSUPPORTED_DATE_PATTERN = re.compile(
+    r"\b(" + "|".join(MONTHS) + r"|month|months|year|years|quarter|ago|since|between|until|before|after|"
+    r"days|weeks|tomorrow|next|weekend)\b|\d{1,4}[-/]\d{1,2}"
+)
+# Questions that name a specific task need the LLM to pull out the task name
+TASK_NAME_PATTERN = re.compile(r"\b(task|ticket|card)s?\s+(called|named|titled)\b|[\"“”']\w[^\"“”']*[\"“”']")
+# Capitalized words that are not entity names
+COMMON_CAPITALIZED = {"i", "what", "who", "which", "when", "where", "why", "how", "is", "are", "did", "does", "do",
+                      "show", "list", "give", "tell", "any", "the", "a", "an", "can", "could", "please", "summarize"}
+
+
+def normalize_question(question):
+    """Lowercase a question and collapse whitespace, for matching and memoization."""
+    return re.sub(r"\s+", " ", question.strip().lower())
+
+
+def _full_day(day):
+    return {"start": f"{day.isoformat()}T00:00:00", "end": f"{day.isoformat()}T23:59:59"}
+
+
+def _work_week(monday):
+    friday = monday + timedelta(days=4)
+    return {"start": f"{monday.isoformat()}T00:00:00", "end": f"{friday.isoformat()}T23:59:59"}
+
+
+def _last_days(today, days):
+    start = today - timedelta(days=days - 1)
+    return {"start": f"{start.isoformat()}T00:00:00", "end": f"{today.isoformat()}T23:59:59"}
+
+
+def _extract_date_range(text, today):
+    """Return (date_range, matched_spans) for the date phrases found in normalized text."""
+    monday = today - timedelta(days=today.weekday())
+    ranges, spans = [], []
+
+    for match in re.finditer(r"\b(today|yesterday|this week|last week|past week)\b", text):
+        phrase = match.group(1)
+        if phrase == "today":
+            ranges.append(_full_day(today))
+        elif phrase == "yesterday":
+            ranges.append(_full_day(today - timedelta(days=1)))
+        elif phrase == "this week":
+            ranges.append(_work_week(monday))
+        elif phrase == "past week":
+            ranges.append(_last_days(today, 7))
+        else:
+            ranges.append(_work_week(monday - timedelta(days=7)))
+        spans.append(match.span())
+
+    weekday_pattern = r"\b(?:(last|this|on|past)\s+)?(" + "|".join(WEEKDAYS) + r")\b"
+    for match in re.finditer(weekday_pattern, text):
+        qualifier, weekday = match.group(1), WEEKDAYS.index(match.group(2))
+        day = monday + timedelta(days=weekday)
+        # "last Tuesday" is always the previous week; a bare or "this" weekday that
+        # has not happened yet this week refers to the most recent one
+        if qualifier == "last" or (qualifier != "this" and day > today):
+            day -= timedelta(days=7)
+        ranges.append(_full_day(day))
+        spans.append(match.span())
+
+    if len(ranges) != 1:
+        return (None if not ranges else False), spans
+    return ranges[0], spans
+
+
+def _find_names(text, names):
+    """Find known names in normalized text, preferring the longest match at each position."""
+    found, spans = [], []
+    for name in sorted(names, key=len, reverse=True):
+        pattern = r"(?<![\w-])" + re.escape(name) + r"(?:'s)?(?![\w-])"
+        for match in re.finditer(pattern, text):
+            if any(start < match.end() and match.start() < end for start, end in spans):
+                continue
+            found.append(name)
+            spans.append(match.span())
+            break
+    return found, spans
+
+
+def _names_a_project(question, span):
+    """
+    Whether a known project name found at `span` of the normalized question is meant as
+    the project: written capitalized (as a proper noun) or next to the word "project".
+    Project names such as "design" are otherwise just ordinary words.
+    """
+    # Collapsing whitespace keeps the positions of the normalized text
+    original = re.sub(r"\s+", " ", question.strip())
+    start, end = span
+    if original[start:end] != original[start:end].lower():
+        return True
+    text = original.lower()
+    return bool(re.search(r"\bproject\s+$", text[:start]) or re.match(r"(?:'s)?\s+project\b", text[end:]))
+
+
+def extract_filters_locally(question, today=None, known_assignees=(), known_projects=()):
+    """
+    Rule-based version of extract_filters_from_question for common question shapes.
+
+    Handles "today", "yesterday", "this week", "last week", "past week" (the last 7
+    days), weekday names and known assignee/project names. Returns (filters, confident);
+    confident is False, and the caller should fall back to the LLM extractor, when
+    the rules are unsure or recognised nothing at all (the question may still name a task).
+    """
+    today = today or datetime.now().astimezone().date()
+    if isinstance(today, datetime):
+        today = today.date()
+    text = normalize_question(question)
+
+    # Without a vocabulary an unrecognised name cannot be told apart from ordinary words
+    if not known_assignees and not known_projects:
+        return {}, False
+    if UNSUPPORTED_DATE_PATTERN.search(text) or TASK_NAME_PATTERN.search(question):
+        return {}, False
+
+    filters = {}
+    date_range, date_spans = _extract_date_range(text, today)
+    if date_range is False:
+        return {}, False  # several conflicting date phrases
+    if date_range:
+        filters["date_range"] = date_range
+
+    assignees, assignee_spans = _find_names(text, known_assignees)
+    if assignees:
+        filters["assignees"] = assignees
+
+    projects, project_spans = _find_names(text, set(known_projects) - set(assignees))
+    if len(projects) > 1:
+        return {}, False
+    if projects and not _names_a_project(question, project_spans[0]):
+        return {}, False  # a project name used as an ordinary word
+    if projects:
+        filters["project"] = projects[0]
+
+    # A capitalized word that no rule consumed is probably a name we do not know
+    consumed = date_spans + assignee_spans + project_spans
+    for i, match in enumerate(re.finditer(r"[A-Z][\w-]*", question)):
+        word = match.group(0).lower()
+        if (i == 0 and match.start() == 0) or word in COMMON_CAPITALIZED:
+            continue
+        if word in WEEKDAYS or word in MONTHS:
+            continue
+        position = len(normalize_question(question[:match.start()] + "x")) - 1
+        if not any(start <= position < end for start, end in consumed):
+            return {}, False
+
+    if not filters:
+        return {}, False
+    return filters, True
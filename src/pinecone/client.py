@@ -1,12 +1,58 @@
 import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
+from src.utils.adaptive_limiter import get_adaptive_limiter
 
 load_dotenv()
 
-def get_pinecone_index_name(index_name="mergestack-index", dimension=1536):
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+PINECONE_INDEX_NAME = "mergestack-index"
+# Connection pool size of each index handle
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "8"))
 
+# Pinecone request limits (2MB per upsert request, 40KB of metadata per vector)
+UPSERT_MAX_BATCH_VECTORS = int(os.getenv("PINECONE_UPSERT_BATCH_SIZE", "100"))
+UPSERT_MAX_BATCH_BYTES = int(os.getenv("PINECONE_UPSERT_BATCH_BYTES", str(2 * 1024 * 1024 - 64 * 1024)))
+# Upper bound on concurrent upsert requests; the adaptive limiter picks the actual number
+UPSERT_MAX_WORKERS = int(os.getenv("PINECONE_UPSERT_WORKERS", str(PINECONE_POOL_THREADS)))
+METADATA_MAX_BYTES = 40 * 1024
+
+# Free-text metadata fields that may be shortened to fit the metadata limit, in trim order
+TRIMMABLE_METADATA_FIELDS = ("task_description", "content")
+
+# Process-wide client, verified index names and index handles
+_client = None
+_verified_indexes = set()
+_index_handles = {}
+_lock = threading.Lock()
+
+# Concurrency of upsert requests across every caller in the process
+upsert_limiter = get_adaptive_limiter("pinecone_upsert", initial=2, maximum=UPSERT_MAX_WORKERS)
+
+
+def get_pinecone_client():
+    """Get the process-wide Pinecone client, creating it on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        return _client
+
+
+def get_pinecone_index_name(index_name=PINECONE_INDEX_NAME, dimension=1536, refresh=False):
+    """
+    Make sure the index exists and return its name.
+
+    The existence check (and creation) hits the control plane, so it runs once per
+    process; pass refresh=True to check again.
+    """
+    with _lock:
+        if index_name in _verified_indexes and not refresh:
+            return index_name
+
+    pc = get_pinecone_client()
     existing_indexes = [idx.name for idx in pc.list_indexes()]
     if index_name not in existing_indexes:
         pc.create_index(
@@ -19,4 +65,112 @@ def get_pinecone_index_name(index_name="mergestack-index", dimension=1536):
             )
         )
 
+    with _lock:
+        _verified_indexes.add(index_name)
     return index_name  # ✅ just return index name
+
+
+def get_pinecone_index(index_name=PINECONE_INDEX_NAME, refresh=False):
+    """Get a shared, connection-pooled handle to an index, verifying it exists on first use."""
+    get_pinecone_index_name(index_name, refresh=refresh)
+    pc = get_pinecone_client()
+    with _lock:
+        if index_name not in _index_handles or refresh:
+            _index_handles[index_name] = pc.Index(index_name, pool_threads=PINECONE_POOL_THREADS)
+        return _index_handles[index_name]
+
+
+def refresh_pinecone_indexes():
+    """Forget cached index checks and handles so the next call re-verifies against Pinecone."""
+    with _lock:
+        _verified_indexes.clear()
+        _index_handles.clear()
+
+
+def json_size(value):
+    """Size in bytes of a value once serialized to JSON."""
+    return len(json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"))
+
+
+def fit_metadata(metadata, max_bytes=METADATA_MAX_BYTES):
+    """
+    Trim free-text metadata fields so the metadata fits Pinecone's per-vector limit.
+
+    Returns None when the metadata is still too large once those fields are trimmed.
+    """
+    overflow = json_size(metadata) - max_bytes
+    if overflow <= 0:
+        return metadata
+
+    metadata = dict(metadata)
+    for field in TRIMMABLE_METADATA_FIELDS:
+        value = metadata.get(field)
+        if not isinstance(value, str) or not value:
+            continue
+        # Characters can take several bytes, so cut by the encoded length
+        encoded = value.encode("utf-8")
+        keep = max(len(encoded) - overflow - 16, 0)
+        metadata[field] = encoded[:keep].decode("utf-8", errors="ignore")
+        overflow = json_size(metadata) - max_bytes
+        if overflow <= 0:
+            return metadata
+
+    return None
+
+
+def batch_vectors(vectors, max_vectors=UPSERT_MAX_BATCH_VECTORS, max_bytes=UPSERT_MAX_BATCH_BYTES):
+    """Group vectors into upsert batches capped by vector count and payload bytes."""
+    batch, batch_bytes = [], 0
+    for vector in vectors:
+        size = json_size(vector)
+        if batch and (len(batch) >= max_vectors or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(vector)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def upsert_vectors(index, vectors, namespace="default", max_workers=UPSERT_MAX_WORKERS):
+    """
+    Upsert vectors in size-capped batches, sending up to max_workers batches at once.
+
+    Batches go through the shared adaptive limiter, which decides how many run at once
+    across all callers and retries rate-limited or timed-out batches.
+    A failed batch does not stop the others. Vectors whose metadata cannot be trimmed
+    under the limit are not sent and are reported as failed. Returns a summary:
+      {"upserted": int, "failed": [{"batch": int, "ids": [...], "error": str}]}
+    """
+    summary = {"upserted": 0, "failed": []}
+    fitted, oversized = [], []
+    for v in vectors:
+        metadata = fit_metadata(v.get("metadata", {}))
+        if metadata is None:
+            oversized.append(v["id"])
+        else:
+            fitted.append({**v, "metadata": metadata})
+    if oversized:
+        # Pinecone would reject the whole batch, so these are reported as failed up front
+        print(f"❌ {len(oversized)} vectors have more than {METADATA_MAX_BYTES} bytes of metadata after trimming in namespace {namespace}")
+        summary["failed"].append({"batch": None, "ids": oversized, "error": f"metadata exceeds {METADATA_MAX_BYTES} bytes"})
+
+    batches = list(batch_vectors(fitted))
+    if not batches:
+        return summary
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(upsert_limiter.call, index.upsert, vectors=batch, namespace=namespace): (i, batch)
+            for i, batch in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            i, batch = futures[future]
+            try:
+                future.result()
+                summary["upserted"] += len(batch)
+            except Exception as e:
+                print(f"❌ Upsert batch {i} ({len(batch)} vectors) failed in namespace {namespace}: {str(e)}")
+                summary["failed"].append({"batch": i, "ids": [v["id"] for v in batch], "error": str(e)})
+
+    return summary
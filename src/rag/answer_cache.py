@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+from dotenv import load_dotenv
+from src.clickup.catalog import load_catalog
+from src.openai.filter_rules import normalize_question
+from src.utils.helpers import get_data_dir
+
+load_dotenv()
+
+ANSWER_CACHE_FILE = "answer_cache.sqlite3"
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+# Cosine similarity above which a cached question counts as the same question
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+# Answers older than this are never served, even if nothing was re-ingested
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL", "86400"))
+# Words that can differ between two questions that still ask the same thing
+QUESTION_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "at", "by", "with", "about", "and", "or",
+    "what", "which", "who", "how", "is", "are", "was", "were", "be", "been", "do", "does", "did",
+    "done", "has", "have", "had", "can", "could", "please", "me", "us", "tell", "show", "give",
+    "list", "any", "all", "there", "that", "this", "these", "those", "it", "its",
+}
+
+
+def _namespace_key(namespace):
+    namespaces = [namespace] if isinstance(namespace, str) else sorted(namespace)
+    # Delimited on both sides so one namespace can be found with instr()
+    return "|" + "|".join(namespaces) + "|", namespaces
+
+
+def question_terms(question):
+    """
+    The content words of a question, sorted. Questions only count as the same when
+    these match, so a different name, project or date never hits another's answer
+    however close the embeddings are.
+    """
+    words = re.findall(r"[a-z0-9]+", normalize_question(question))
+    return " ".join(sorted({word for word in words if word not in QUESTION_STOPWORDS}))
+
+
+def _namespace_versions(namespaces):
+    """Last sync time of each namespace from the catalog; a new sync means a new version."""
+    entries = load_catalog()["namespaces"]
+    return json.dumps({ns: entries.get(ns, {}).get("last_synced_at") for ns in namespaces}, sort_keys=True)
+
+
+class AnswerCache:
+    """
+    On-disk cache of generated answers, looked up by question similarity.
+
+    Entries are keyed by namespace(s), the normalized metadata filter and the question's
+    content words (question_terms); a lookup hits when the question embedding is also
+    within `similarity` of a cached one, which absorbs word order, punctuation and
+    filler words. Entries are
+    dropped when their namespace is written to (invalidate_namespace) or re-synced
+    (catalog last_synced_at changes), after the TTL, and least recently used first
+    past max_entries.
+    """
+
+    def __init__(self, path=None, similarity=ANSWER_CACHE_SIMILARITY, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL_SECONDS):
+        self.path = path or os.path.join(get_data_dir(), ANSWER_CACHE_FILE)
+        self.similarity = similarity
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(answers)")}
+        if columns and "terms" not in columns:
+            # Entries cached before question terms were part of the key cannot be trusted
+            self._conn.execute("DROP TABLE answers")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "id INTEGER PRIMARY KEY, namespaces TEXT NOT NULL, filter TEXT NOT NULL, terms TEXT NOT NULL, "
+            "versions TEXT NOT NULL, embedding BLOB NOT NULL, question TEXT NOT NULL, answer TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_key ON answers (namespaces, filter, terms)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+
+    @staticmethod
+    def filter_key(metadata_filter):
+        return json.dumps(metadata_filter or {}, sort_keys=True)
+
+    def get(self, namespace, metadata_filter, embedding, question):
+        """Return {"question", "answer", "similarity"} of the closest cached answer above the threshold, or None."""
+        namespace_key, namespaces = _namespace_key(namespace)
+        versions = _namespace_versions(namespaces)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, versions, embedding, question, answer FROM answers "
+                "WHERE namespaces = ? AND filter = ? AND terms = ? AND created_at > ?",
+                (namespace_key, self.filter_key(metadata_filter), question_terms(question), time.time() - self.ttl),
+            ).fetchall()
+            # Answers from before the namespace's last sync are stale
+            stale = [row[0] for row in rows if row[1] != versions]
+            if stale:
+                self._conn.execute(f"DELETE FROM answers WHERE id IN ({','.join('?' * len(stale))})", stale)
+            rows = [row for row in rows if row[1] == versions]
+            if not rows:
+                return None
+
+            query = np.asarray(embedding, dtype=np.float32)
+            cached = np.stack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+            norms = np.linalg.norm(cached, axis=1) * (np.linalg.norm(query) or 1.0)
+            scores = cached @ query / np.where(norms == 0, 1.0, norms)
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity:
+                return None
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), rows[best][0]))
+            return {"question": rows[best][3], "answer": rows[best][4], "similarity": float(scores[best])}
+
+    def put(self, namespace, metadata_filter, embedding, question, answer):
+        """Cache an answer, evicting least recently used entries past the size limit."""
+        namespace_key, namespaces = _namespace_key(namespace)
+        now = time.time()
+        row = (
+            namespace_key,
+            self.filter_key(metadata_filter),
+            question_terms(question),
+            _namespace_versions(namespaces),
+            np.asarray(embedding, dtype=np.float32).tobytes(),
+            question,
+            answer,
+            now,
+            now,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (namespaces, filter, terms, versions, embedding, question, answer, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM answers WHERE id IN (SELECT id FROM answers ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def invalidate_namespace(self, namespace):
+        """Drop every answer drawn from a namespace, including multi-namespace answers. Returns the count."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM answers WHERE instr(namespaces, ?) > 0", (f"|{namespace}|",)
+            )
+            return cursor.rowcount
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Get the process-wide answer cache, or None when caching is disabled."""
+    global _cache
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
+
+
+def invalidate_answers(namespace):
+    """Forget cached answers for a namespace after its vectors change."""
+    # Nothing can be cached before the cache file exists; avoid creating it just to empty it
+    if _cache is None and not os.path.exists(os.path.join(get_data_dir(), ANSWER_CACHE_FILE)):
+        return
+    cache = get_answer_cache()
+    if cache:
+        dropped = cache.invalidate_namespace(namespace)
+        if dropped:
+            print(f"🗑️ Dropped {dropped} cached answers for {namespace}")
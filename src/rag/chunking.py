@@ -0,0 +1,76 @@
+import os
+from dotenv import load_dotenv
+from src.openai.client import get_encoding
+
+load_dotenv()
+
+# Docs longer than CHUNK_MAX_TOKENS are split into chunks that overlap by CHUNK_OVERLAP_TOKENS
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "1000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "100"))
+
+
+def chunk_text(text, max_tokens=CHUNK_MAX_TOKENS, overlap=CHUNK_OVERLAP_TOKENS):
+    """Split text into pieces of at most max_tokens tokens, each overlapping the previous one."""
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+    encoding = get_encoding()
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+
+    pieces = []
+    step = max_tokens - overlap
+    for start in range(0, len(tokens), step):
+        pieces.append(encoding.decode(tokens[start:start + max_tokens]))
+        if start + max_tokens >= len(tokens):
+            break
+    return pieces
+
+
+def chunk_parent_id(metadata):
+    """Stable identifier shared by all chunks of one source document, derived from its task."""
+    parts = [str(metadata.get("parent_task_id", "unknown")), metadata.get("document_type", "unknown")]
+    doc_type = metadata.get("document_type")
+    if doc_type == "comment":
+        parts.append(str(metadata.get("comment_id")))
+    elif doc_type == "reply":
+        parts += [str(metadata.get("parent_comment_id")), str(metadata.get("timestamp_ms"))]
+    elif doc_type == "activity":
+        parts += [str(metadata.get("activity_type")), str(metadata.get("timestamp_ms"))]
+    return ":".join(parts)
+
+
+def chunk_documents(docs, max_tokens=CHUNK_MAX_TOKENS, overlap=CHUNK_OVERLAP_TOKENS):
+    """
+    Split docs whose content exceeds max_tokens into linked chunk docs.
+
+    Docs within the limit pass through untouched. Chunks repeat the doc's first
+    line (the "Task Title: ..." header) so each one keeps its task context, and
+    carry chunk_parent_id / chunk_index / chunk_count metadata linking them together.
+    """
+    encoding = get_encoding()
+    for doc in docs:
+        content = doc.get("content", "")
+        if len(encoding.encode(content)) <= max_tokens:
+            yield doc
+            continue
+
+        header, _, body = content.partition("\n")
+        header_tokens = len(encoding.encode(header)) + 1
+        if header_tokens * 2 > max_tokens:
+            header, body, header_tokens = "", content, 0
+
+        metadata = doc.get("metadata", {})
+        parent_id = chunk_parent_id(metadata)
+        pieces = chunk_text(body, max_tokens - header_tokens, min(overlap, (max_tokens - header_tokens) // 2))
+        for i, piece in enumerate(pieces):
+            chunk_content = f"{header}\n{piece}" if header else piece
+            chunk_metadata = {
+                **metadata,
+                "chunk_parent_id": parent_id,
+                "chunk_index": i,
+                "chunk_count": len(pieces),
+            }
+            if "content" in metadata:
+                chunk_metadata["content"] = chunk_content
+            yield {"content": chunk_content, "metadata": chunk_metadata}
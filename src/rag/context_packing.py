@@ -0,0 +1,90 @@
+import os
+import re
+import numpy as np
+from dotenv import load_dotenv
+from src.openai.client import get_encoding
+
+load_dotenv()
+
+# Prompt tokens available for retrieved documents
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+# Relevance vs. diversity trade-off for MMR (1.0 = relevance only)
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+# Docs at least this similar to an already selected doc are treated as duplicates
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_SIMILARITY", "0.97"))
+
+
+def _normalized_text(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def drop_contained(docs):
+    """Drop docs whose text is fully contained in another doc, e.g. a comment inside its discussion doc."""
+    texts = [_normalized_text(doc["content"]) for doc in docs]
+    kept = []
+    for i, text in enumerate(texts):
+        contained = any(
+            j != i and text in other and (len(other) > len(text) or j < i)
+            for j, other in enumerate(texts)
+        )
+        if not contained:
+            kept.append(docs[i])
+    return kept
+
+
+def _unit_rows(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def mmr_order(question_embedding, doc_embeddings, lambda_mult=MMR_LAMBDA, duplicate_similarity=NEAR_DUPLICATE_SIMILARITY):
+    """
+    Order docs by maximal marginal relevance, skipping near-duplicates.
+
+    Returns the positions of the selected docs, most useful first.
+    """
+    if not doc_embeddings:
+        return []
+    docs = _unit_rows(doc_embeddings)
+    relevance = docs @ _unit_rows(question_embedding)
+    similarity = docs @ docs.T
+
+    selected = []
+    remaining = list(range(len(docs)))
+    while remaining:
+        if selected:
+            redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining))
+        scores = lambda_mult * relevance[remaining] - (1 - lambda_mult) * redundancy
+        best = int(np.argmax(scores))
+        candidate = remaining.pop(best)
+        if redundancy[best] < duplicate_similarity:
+            selected.append(candidate)
+    return selected
+
+
+def pack_context(docs, question_embedding, token_budget=CONTEXT_TOKEN_BUDGET, max_docs=10):
+    """
+    Choose which retrieved docs go into the prompt.
+
+    Docs need "content" and "values" (their embedding). Contained and near-duplicate
+    docs are dropped, the rest are ordered by MMR and added until the token budget
+    or max_docs is reached. Returns (packed_docs, used_tokens).
+    """
+    encoding = get_encoding()
+    docs = [doc for doc in docs if doc.get("values")]
+    docs = drop_contained(docs)
+
+    packed, used_tokens = [], 0
+    for position in mmr_order(question_embedding, [doc["values"] for doc in docs]):
+        doc = docs[position]
+        tokens = len(encoding.encode(doc["content"]))
+        if used_tokens + tokens > token_budget:
+            continue  # a shorter doc further down may still fit
+        packed.append(doc)
+        used_tokens += tokens
+        if len(packed) >= max_docs:
+            break
+    return packed, used_tokens
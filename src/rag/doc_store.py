@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from dotenv import load_dotenv
+from src.utils.helpers import get_data_dir
+
+load_dotenv()
+
+DOC_STORE_FILE = "doc_store.sqlite3"
+# Keep document bodies locally instead of in Pinecone metadata
+LOCAL_DOC_STORE = os.getenv("LOCAL_DOC_STORE", "false").lower() == "true"
+# Metadata fields moved to the local store; everything else stays filterable in Pinecone
+BODY_METADATA_FIELDS = ("content", "task_description")
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+def split_metadata(metadata):
+    """Split vector metadata into (filterable metadata, body fields)."""
+    body = {field: metadata[field] for field in BODY_METADATA_FIELDS if field in metadata}
+    filterable = {key: value for key, value in metadata.items() if key not in BODY_METADATA_FIELDS}
+    return filterable, body
+
+
+class DocStore:
+    """Compressed key-value store of document bodies, keyed by namespace and vector ID."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), DOC_STORE_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "namespace TEXT NOT NULL, id TEXT NOT NULL, body BLOB NOT NULL, PRIMARY KEY (namespace, id))"
+        )
+
+    def put_many(self, namespace, bodies):
+        """Store bodies given as {vector_id: {field: value}}."""
+        rows = [
+            (namespace, doc_id, zlib.compress(json.dumps(body).encode("utf-8")))
+            for doc_id, body in bodies.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def get_many(self, namespace, ids):
+        """Fetch bodies for many vector IDs in one pass. Returns {vector_id: {field: value}}."""
+        ids = list(ids)
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), _SQL_BATCH):
+                chunk = ids[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, body FROM docs WHERE namespace = ? AND id IN ({placeholders})",
+                    [namespace, *chunk],
+                ).fetchall()
+                for doc_id, blob in rows:
+                    found[doc_id] = json.loads(zlib.decompress(blob).decode("utf-8"))
+        return found
+
+    def delete_many(self, namespace, ids):
+        """Remove bodies for the given vector IDs."""
+        ids = list(ids)
+        with self._lock:
+            for start in range(0, len(ids), _SQL_BATCH):
+                chunk = ids[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                self._conn.execute(
+                    f"DELETE FROM docs WHERE namespace = ? AND id IN ({placeholders})",
+                    [namespace, *chunk],
+                )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def doc_store_in_use():
+    """Whether bodies may be kept locally: the store is enabled, or was enabled before and has data."""
+    return LOCAL_DOC_STORE or _store is not None or os.path.exists(os.path.join(get_data_dir(), DOC_STORE_FILE))
+
+
+def get_doc_store():
+    """Get the process-wide local document store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DocStore()
+        return _store
@@ -1,47 +1,153 @@
 import os
-from src.openai.client import extract_filters_from_question, get_embedder, get_llm
-from src.pinecone.client import get_pinecone_index_name
-from pinecone import Pinecone
+import json
+from src.openai.client import (
+    EMBEDDING_MAX_CONCURRENCY,
+    extract_filters_from_question,
+    get_batch_embedder,
+    get_embedder,
+    get_llm,
+    get_streaming_llm,
+)
+from src.vectorstore.client import get_vector_store
+from src.rag.answer_cache import get_answer_cache, invalidate_answers
+from src.rag.chunking import chunk_documents
+from src.rag.context_packing import pack_context
+from src.rag.doc_store import LOCAL_DOC_STORE, get_doc_store, split_metadata
 import dateparser.search
 from datetime import datetime, timedelta
 import hashlib
+import heapq
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import batched
 from datetime import datetime
 from src.utils.helpers  import date_to_milliseconds
-
-
-
-def store_documents_openai(docs, namespace="default"):
-    """Store documents in Pinecone using OpenAI embeddings."""
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    index = pc.Index(get_pinecone_index_name())
-    embedder = get_embedder()
-
-    for doc in docs:
-        content = doc.get("content", "")
-        metadata = doc.get("metadata", {})
-        if not content:
-            continue  # Skip docs without content
-
-        # Collect stable fields to create a reproducible unique ID
-        task_id = metadata.get('task_id', 'unknown')
-        doc_type = metadata.get('document_type', 'unknown')
-        created_at_ms = metadata.get('created_at_ms', '0')
-
-        # Combine stable fields + content snippet (first 200 chars)
-        id_source = f"{task_id}_{doc_type}_{created_at_ms}_{content[:200]}"
-        
-        # Create a SHA256 hash of the id_source for fixed-length unique ID
-        doc_id = hashlib.sha256(id_source.encode('utf-8')).hexdigest()
-
-        embedding = embedder(content)
-        index.upsert(
-            vectors=[{
-                "id": doc_id,
-                "values": embedding,
-                "metadata": metadata,
-            }],
-            namespace=namespace
-        )
+from src.utils.metrics import format_breakdown, question_trace, span, submit_with_context
+
+
+
+# Number of documents embedded together before their vectors are upserted
+EMBED_CHUNK_SIZE = int(os.getenv("EMBED_CHUNK_SIZE", "256"))
+# Chunks of one ingest being embedded ahead of the one being upserted
+EMBED_CHUNKS_IN_FLIGHT = int(os.getenv("EMBED_CHUNKS_IN_FLIGHT", "4"))
+# Shared by every ingest; the OpenAI adaptive limiter decides how many requests actually run
+_embed_chunk_pool = ThreadPoolExecutor(max_workers=EMBEDDING_MAX_CONCURRENCY, thread_name_prefix="rag-embed")
+# Number of recent question embeddings kept in memory
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "512"))
+
+# Docs retrieved per question before context packing picks the ones sent to the LLM
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "20"))
+
+# Shared workers for the independent per-question calls
+_query_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-query")
+# Namespaces queried at once when a question spans several spaces
+NAMESPACE_FANOUT_WORKERS = int(os.getenv("NAMESPACE_FANOUT_WORKERS", "16"))
+_fanout_pool = ThreadPoolExecutor(max_workers=NAMESPACE_FANOUT_WORKERS, thread_name_prefix="rag-fanout")
+
+
+def make_doc_id(content, metadata):
+    """
+    Create a reproducible unique ID for a document.
+
+    IDs look like "<parent_task_id>#<document_type>#<sha256>" so every vector of a
+    task can be listed by prefix when reconciling a namespace.
+    """
+    prefix = f"{metadata.get('parent_task_id', 'unknown')}#{metadata.get('document_type', 'unknown')}#"
+
+    # Chunks of a long document keep their ID when its text changes
+    if "chunk_parent_id" in metadata:
+        id_source = f"{metadata['chunk_parent_id']}_chunk_{metadata.get('chunk_index', 0)}"
+        return prefix + hashlib.sha256(id_source.encode('utf-8')).hexdigest()
+
+    # Collect stable fields to create a reproducible unique ID
+    task_id = metadata.get('task_id', 'unknown')
+    doc_type = metadata.get('document_type', 'unknown')
+    created_at_ms = metadata.get('created_at_ms', '0')
+
+    # Combine stable fields + content snippet (first 200 chars)
+    id_source = f"{task_id}_{doc_type}_{created_at_ms}_{content[:200]}"
+
+    # Create a SHA256 hash of the id_source for fixed-length unique ID
+    return prefix + hashlib.sha256(id_source.encode('utf-8')).hexdigest()
+
+
+def store_documents_openai(docs, namespace="default", local_bodies=LOCAL_DOC_STORE, progress=None):
+    """Store documents in the vector store using batched OpenAI embeddings and bulk upserts.
+
+    `docs` may be any iterable, including a generator; it is consumed in chunks of
+    EMBED_CHUNK_SIZE docs. Up to EMBED_CHUNKS_IN_FLIGHT chunks are embedded concurrently
+    while earlier ones are upserted in order.
+    With local_bodies=True the content and task description are written to the
+    local doc store and only filterable fields go to the vector store.
+    `progress`, if given, is called with the running summary after every chunk.
+    Returns {"docs": int, "upserted": int, "ids": set of stored IDs, "failed": [...]}.
+    """
+    store = get_vector_store()
+    embed_batch = get_batch_embedder()
+    doc_store = get_doc_store() if local_bodies else None
+
+    def prepared_docs():
+        # Oversized docs are split so every embedding input stays within the model limit
+        for doc in chunk_documents(docs):
+            content = doc.get("content", "")
+            metadata = doc.get("metadata", {})
+            if not content:
+                continue  # Skip docs without content
+            yield make_doc_id(content, metadata), content, metadata
+
+    summary = {"docs": 0, "upserted": 0, "ids": set(), "failed": []}
+    in_flight = deque()
+
+    def store_next():
+        chunk, future = in_flight.popleft()
+        embeddings = future.result()
+        vectors = [
+            {"id": doc_id, "values": embedding, "metadata": metadata}
+            for (doc_id, _, metadata), embedding in zip(chunk, embeddings)
+        ]
+        if doc_store:
+            # Bodies are written first so a stored vector can always be hydrated
+            bodies = {}
+            for vector in vectors:
+                vector["metadata"], bodies[vector["id"]] = split_metadata(vector["metadata"])
+            doc_store.put_many(namespace, bodies)
+        with span("upsert", backend=type(store).__name__) as s:
+            result = store.upsert(vectors, namespace=namespace)
+            s["items"] = result["upserted"]
+            s["failed"] = sum(len(f["ids"]) for f in result["failed"])
+            s["bytes"] = sum(
+                4 * len(v["values"]) + len(json.dumps(v["metadata"], default=str).encode("utf-8"))
+                for v in vectors
+            )
+        summary["upserted"] += result["upserted"]
+        summary["failed"].extend(result["failed"])
+        failed_ids = {doc_id for failure in result["failed"] for doc_id in failure["ids"]}
+        summary["ids"].update(v["id"] for v in vectors if v["id"] not in failed_ids)
+        print(f"⬆️ Upserted {summary['upserted']} vectors so far into namespace: {namespace}")
+        if progress:
+            progress(summary)
+
+    try:
+        for chunk in batched(prepared_docs(), EMBED_CHUNK_SIZE):
+            summary["docs"] += len(chunk)
+            future = submit_with_context(_embed_chunk_pool, embed_batch, [content for _, content, _ in chunk])
+            in_flight.append((chunk, future))
+            if len(in_flight) >= EMBED_CHUNKS_IN_FLIGHT:
+                store_next()
+        while in_flight:
+            store_next()
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+
+    if summary["upserted"]:
+        invalidate_answers(namespace)
+    if summary["failed"]:
+        failed_count = sum(len(f["ids"]) for f in summary["failed"])
+        print(f"⚠️ {len(summary['failed'])} upsert batches ({failed_count} vectors) failed in namespace: {namespace}")
+    return summary
 
 
 def build_pinecone_filter(question: str) -> dict:
@@ -115,42 +221,108 @@ def build_pinecone_filter(question: str) -> dict:
 
 
 
-def get_relevant_docs(question, namespace="default"):
-    """Retrieve relevant documents from Pinecone with content based on dynamic filters."""
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    index_name = get_pinecone_index_name()
-    index = pc.Index(index_name)
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _embed_query_cached(question):
+    return tuple(get_embedder()(question))
 
-    embedder = get_embedder()
-    embedding = embedder(question)
 
-    # 🔥 NEW: Dynamically extract metadata filter
-    metadata_filter = build_pinecone_filter(question)
+def embed_query(question):
+    """Embed a question, reusing embeddings of recently asked questions."""
+    return list(_embed_query_cached(question))
 
-    results = index.query(
-        vector=embedding,
-        top_k=10,
-        namespace=namespace,
-        filter=metadata_filter if metadata_filter else {},
-        include_metadata=True
 
-    )
-    # Return list of documents with id and content (assuming content is in metadata or payload)
-    print(len(results["matches"]))
+def _namespace_list(namespace):
+    return [namespace] if isinstance(namespace, str) else list(namespace)
+
+
+def prepare_query(question):
+    """Embed a question and extract its metadata filter concurrently. Returns (embedding, filter)."""
+    # The question embedding and the filter extraction are independent, so run them side by side
+    embedding_future = submit_with_context(_query_pool, embed_query, question)
+    filter_future = submit_with_context(_query_pool, build_pinecone_filter, question)
+    # 🔥 NEW: Dynamically extract metadata filter
+    return embedding_future.result(), filter_future.result()
+
+
+def get_relevant_docs(question, namespace="default", top_k=10, include_values=False, stats=None, query=None):
+    """Retrieve relevant documents from the vector store with content based on dynamic filters.
+
+    `namespace` may be a single namespace or a list of them. Several namespaces are
+    queried concurrently with one embedding and one filter, and their matches are
+    merged into a global top_k by score; a namespace that fails is skipped.
+
+    Each doc has "id", "namespace", "content" and "score", plus its embedding as
+    "values" when include_values=True. If a `stats` dict is given, stats["namespaces"]
+    maps each namespace to {"seconds", "matches"} (or {"seconds", "error"}).
+    `query` is an (embedding, filter) pair from prepare_query, computed here if not given.
+    """
+    namespaces = _namespace_list(namespace)
+    stats = stats if stats is not None else {}
+    embedding, metadata_filter = query or prepare_query(question)
+    store = get_vector_store()
+
+    if len(namespaces) == 1:
+        started = time.perf_counter()
+        docs = _query_namespace(store, namespaces[0], embedding, metadata_filter, top_k, include_values)
+        stats["namespaces"] = {namespaces[0]: {"seconds": time.perf_counter() - started, "matches": len(docs)}}
+        return docs
+
+    def timed_query(ns):
+        started = time.perf_counter()
+        try:
+            docs = _query_namespace(store, ns, embedding, metadata_filter, top_k, include_values)
+            return docs, {"seconds": time.perf_counter() - started, "matches": len(docs)}
+        except Exception as e:
+            print(f"⚠️ Query failed for namespace {ns}: {e}")
+            return [], {"seconds": time.perf_counter() - started, "error": str(e)}
+
+    futures = {ns: submit_with_context(_fanout_pool, timed_query, ns) for ns in namespaces}
+    all_docs = []
+    stats["namespaces"] = {}
+    for ns, future in futures.items():
+        docs, stats["namespaces"][ns] = future.result()
+        all_docs.extend(docs)
+    return heapq.nlargest(top_k, all_docs, key=lambda doc: doc["score"] or 0.0)
+
+
+def _query_namespace(store, namespace, embedding, metadata_filter, top_k, include_values):
+    """Query one namespace and return its hydrated docs."""
+    with span("vector_query", backend=type(store).__name__) as s:
+        results = store.query(
+            vector=embedding,
+            top_k=top_k,
+            namespace=namespace,
+            filter=metadata_filter if metadata_filter else {},
+            include_metadata=True,
+            include_values=include_values
+        )
+        s["items"] = len(results["matches"])
+    # Return list of documents with id and content (assuming content is in metadata)
     docs = []
     for match in results["matches"]:
         doc_id = match["id"]
-        content = match.get("metadata", {}).get("content") or match.get("payload", {}).get("content")
-        if content is None:
-            content = "<no content available>"
-        docs.append({"id": doc_id, "content": content})
+        content = match["metadata"].get("content")
+        doc = {"id": doc_id, "namespace": namespace, "content": content, "score": match["score"]}
+        if include_values:
+            doc["values"] = match["values"]
+        docs.append(doc)
+
+    # Vectors stored with local bodies carry no content; hydrate them in one lookup
+    missing = [doc["id"] for doc in docs if doc["content"] is None]
+    bodies = {}
+    if missing:
+        with span("doc_store_read") as s:
+            bodies = get_doc_store().get_many(namespace, missing)
+            s["items"] = len(bodies)
+    for doc in docs:
+        if doc["content"] is None:
+            doc["content"] = bodies.get(doc["id"], {}).get("content") or "<no content available>"
     return docs
 
 
 
-def run_rag_pipeline(question: str, namespace="default") -> str:
-    """RAG pipeline using OpenAI SDK with enhanced prompting for quality responses."""
-    relevant_docs = get_relevant_docs(question, namespace)
+def build_rag_messages(question, relevant_docs):
+    """Build the chat messages that ask the LLM to answer a question from retrieved docs."""
     today_str = datetime.now().strftime("%Y-%m-%d")
 
 
@@ -178,11 +350,107 @@ Question: {question}
 Answer:
 """
 
-    llm = get_llm()
-    response = llm([
+    return [
         {"role": "system", "content": "You're a helpful AI assistant trained on ClickUp task data."},
         {"role": "user", "content": prompt}
-    ])
+    ]
+
+
+def get_context_docs(question, namespace="default", stats=None, query=None):
+    """Retrieve candidate docs and pack the most useful, non-redundant ones into the token budget.
+
+    `namespace` may be a list of namespaces; `stats` and `query` are passed on to get_relevant_docs.
+    """
+    query = query or prepare_query(question)
+    candidates = get_relevant_docs(question, namespace, top_k=RETRIEVAL_CANDIDATES, include_values=True, stats=stats, query=query)
+    with span("context_packing") as s:
+        packed, used_tokens = pack_context(candidates, query[0])
+        s["items"] = len(packed)
+        s["tokens"] = used_tokens
+    print(f"📦 Packed {len(packed)} of {len(candidates)} retrieved docs into {used_tokens} context tokens")
+    return packed
+
 
+def get_cached_answer(namespace, query, question):
+    """Look up a cached answer to a similar question with the same filter and content words, or None."""
+    cache = get_answer_cache()
+    if not cache:
+        return None
+    with span("answer_cache") as s:
+        hit = cache.get(namespace, query[1], query[0], question)
+        s["hits"] = int(hit is not None)
+    if hit:
+        print(f"⚡ Answer from cache (similarity {hit['similarity']:.3f} to \"{hit['question']}\")")
+    return hit
+
+
+def cache_answer(namespace, query, question, answer):
+    cache = get_answer_cache()
+    if cache and answer:
+        cache.put(namespace, query[1], query[0], question, answer)
+
+
+def run_rag_pipeline(question: str, namespace="default") -> str:
+    """RAG pipeline using OpenAI SDK with enhanced prompting for quality responses.
+
+    `namespace` may be a list of namespaces to answer from all of them at once.
+    Answers to similar earlier questions are served from the answer cache.
+    """
+    with question_trace(question, namespace) as trace:
+        query = prepare_query(question)
+        cached = get_cached_answer(namespace, query, question)
+        if cached:
+            response = cached["answer"]
+        else:
+            relevant_docs = get_context_docs(question, namespace, query=query)
+
+            llm = get_llm()
+            response = llm(build_rag_messages(question, relevant_docs))
+            cache_answer(namespace, query, question, response)
+
+    print(f"⏱️ {trace['total_seconds']:.2f}s total: {format_breakdown(trace['stages'])}")
     return response
 
+
+def stream_rag_pipeline(question: str, namespace="default", stats=None):
+    """
+    Streaming variant of run_rag_pipeline that yields answer tokens as they arrive.
+
+    If a `stats` dict is given it is filled with timings in seconds:
+    "retrieval", "time_to_first_token" (from the start of the question),
+    "generation" (from the LLM request to the last token) and "total",
+    plus "stages", the per-stage breakdown from the metrics question trace, and
+    "namespaces", the per-namespace query latency from get_relevant_docs.
+    A cached answer is yielded whole, with stats["answer_cache"] set to the hit.
+    `namespace` may be a list of namespaces.
+    """
+    stats = stats if stats is not None else {}
+    started = time.perf_counter()
+
+    with question_trace(question, namespace) as trace:
+        stats["stages"] = trace["stages"]
+        query = prepare_query(question)
+        cached = get_cached_answer(namespace, query, question)
+        if cached:
+            stats["answer_cache"] = cached
+            retrieved = time.perf_counter()
+            stats["retrieval"] = stats["time_to_first_token"] = retrieved - started
+            yield cached["answer"]
+        else:
+            relevant_docs = get_context_docs(question, namespace, stats=stats, query=query)
+            retrieved = time.perf_counter()
+            stats["retrieval"] = retrieved - started
+
+            stream = get_streaming_llm()
+            tokens = []
+            for token in stream(build_rag_messages(question, relevant_docs)):
+                if "time_to_first_token" not in stats:
+                    stats["time_to_first_token"] = time.perf_counter() - started
+                tokens.append(token)
+                yield token
+            # Only complete answers are cached; an abandoned stream never gets here
+            cache_answer(namespace, query, question, "".join(tokens))
+
+    finished = time.perf_counter()
+    stats["generation"] = finished - retrieved
+    stats["total"] = finished - started
@@ -0,0 +1,97 @@
+from collections import Counter
+from src.rag.answer_cache import invalidate_answers
+from src.rag.doc_store import doc_store_in_use, get_doc_store
+from src.vectorstore.client import get_vector_store
+
+
+def delete_vectors(store, ids, namespace):
+    """Delete vectors (and their local bodies) in bulk."""
+    ids = list(ids)
+    store.delete(ids, namespace=namespace)
+    if doc_store_in_use():
+        get_doc_store().delete_many(namespace, ids)
+    invalidate_answers(namespace)
+
+
+def _task_id(vector_id):
+    parts = vector_id.split("#")
+    return parts[0] if len(parts) == 3 else None
+
+
+def _document_type(vector_id):
+    # IDs are "<parent_task_id>#<document_type>#<hash>"; older IDs are a bare hash
+    parts = vector_id.split("#")
+    return parts[1] if len(parts) == 3 else "legacy"
+
+
+def delete_task_vectors(task_id, namespaces, keep_namespace=None):
+    """Delete every vector of a task from the given namespaces (except keep_namespace). Returns the count deleted."""
+    store = get_vector_store()
+    deleted = 0
+    for namespace in namespaces:
+        if namespace == keep_namespace:
+            continue
+        ids = list(store.list_ids(namespace=namespace, prefix=f"{task_id}#"))
+        if ids:
+            delete_vectors(store, ids, namespace)
+            deleted += len(ids)
+            print(f"🧹 Removed {len(ids)} vectors of task {task_id} from {namespace}")
+    return deleted
+
+
+def reconcile_namespace(namespace, produced_ids, task_ids=None, crawled_task_ids=None, task_exists=None):
+    """
+    Delete vectors the latest ingest did not produce.
+
+    With task_ids=None the whole namespace is reconciled (use after a full ingest);
+    otherwise only vectors belonging to those tasks are considered (incremental ingest).
+
+    A task missing from a crawl is not necessarily deleted (the crawl may have filtered
+    it out), so when `crawled_task_ids` and `task_exists` are given, vectors of tasks
+    outside the crawl are only deleted once task_exists(task_id) returns False. Tasks
+    that still exist, or whose check fails, keep their vectors.
+    Returns {"before": int, "deleted": int, "after": int, "deleted_by_type": {...}, "kept_tasks": int}.
+    """
+    store = get_vector_store()
+    if task_ids is None:
+        existing = set(store.list_ids(namespace=namespace))
+    else:
+        existing = set()
+        for task_id in task_ids:
+            existing.update(store.list_ids(namespace=namespace, prefix=f"{task_id}#"))
+
+    orphans = existing - set(produced_ids)
+    kept_tasks = set()
+    if orphans and crawled_task_ids is not None and task_exists is not None:
+        unseen = {_task_id(vector_id) for vector_id in orphans} - set(crawled_task_ids) - {None}
+        for task_id in unseen:
+            try:
+                if task_exists(task_id):
+                    kept_tasks.add(task_id)
+            except Exception as e:
+                print(f"⚠️ Keeping vectors of task {task_id}: could not check whether it still exists: {str(e)}")
+                kept_tasks.add(task_id)
+        orphans = {vector_id for vector_id in orphans if _task_id(vector_id) not in kept_tasks}
+    if orphans:
+        delete_vectors(store, orphans, namespace)
+
+    deleted_by_type = dict(Counter(_document_type(vector_id) for vector_id in orphans))
+    report = {
+        "before": len(existing),
+        "deleted": len(orphans),
+        "after": len(existing) - len(orphans),
+        "deleted_by_type": deleted_by_type,
+        "kept_tasks": len(kept_tasks),
+    }
+    scope = "namespace" if task_ids is None else f"{len(task_ids)} updated tasks"
+    if orphans:
+        shrink = 100 * len(orphans) / len(existing)
+        print(
+            f"🧹 Removed {len(orphans)} stale vectors from {namespace} ({scope}): "
+            f"{report['before']} → {report['after']} (-{shrink:.1f}%) {deleted_by_type}"
+        )
+    else:
+        print(f"🧹 No stale vectors in {namespace} ({scope})")
+    if kept_tasks:
+        print(f"📌 Kept vectors of {len(kept_tasks)} tasks the crawl did not return but that still exist in ClickUp")
+    return report
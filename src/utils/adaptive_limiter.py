@@ -0,0 +1,210 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from src.utils.metrics import set_gauge
+
+load_dotenv()
+
+# Retries of a call that was rate limited, timed out or hit a 5xx or connection error
+ADAPTIVE_MAX_RETRIES = int(os.getenv("ADAPTIVE_MAX_RETRIES", "5"))
+# Pause after a 429 that carries no Retry-After header
+ADAPTIVE_DEFAULT_BACKOFF = float(os.getenv("ADAPTIVE_DEFAULT_BACKOFF", "2"))
+# First pause before retrying a timeout, 5xx or connection error; doubles per attempt
+ADAPTIVE_RETRY_BASE = float(os.getenv("ADAPTIVE_RETRY_BASE", "0.5"))
+ADAPTIVE_RETRY_MAX = float(os.getenv("ADAPTIVE_RETRY_MAX", "8"))
+
+# Outcomes that mean the service is overloaded; these calls are retried
+OVERLOAD_OUTCOMES = ("rate_limited", "timeout", "unavailable")
+
+
+def _retry_after(error):
+    """Seconds to wait according to the Retry-After / retry-after-ms headers of a failed call, or None."""
+    response = getattr(error, "response", None)
+    headers = getattr(error, "headers", None) or getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def classify_error(error):
+    """
+    Return (outcome, retry_after seconds or None) for a failed call. The outcome is
+    "rate_limited" (429), "timeout" (client timeouts, 408, 504), "unavailable" (other
+    5xx and connection errors) or "error" for failures a retry will not fix.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(error, "status", None) or getattr(response, "status_code", None)
+    name = type(error).__name__
+    if status == 429 or name == "RateLimitError":
+        return "rate_limited", _retry_after(error)
+    if isinstance(error, TimeoutError) or "Timeout" in name or status in (408, 504):
+        return "timeout", _retry_after(error)
+    if (isinstance(status, int) and status >= 500) or isinstance(error, ConnectionError) or "Connection" in name \
+            or name in ("InternalServerError", "ServiceUnavailableError", "ProtocolError", "MaxRetryError"):
+        return "unavailable", _retry_after(error)
+    return "error", None
+
+
+def retry_delay(attempt, base=ADAPTIVE_RETRY_BASE, maximum=ADAPTIVE_RETRY_MAX):
+    """Exponential backoff with full jitter before retry number `attempt` (0-based)."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for calls to a rate-limited service.
+
+    The number of calls allowed in flight grows by one per `limit` healthy calls and is
+    cut by `backoff` on 429s, timeouts, 5xx and connection errors (once per `cooldown`
+    seconds, so one overload wave cuts once), or shrunk slightly when recent latency
+    rises well above its long-run baseline. Both are moving averages over every
+    successful call, so a workload that mixes small and large requests settles on
+    a baseline of its own instead of being taken for an overloaded service.
+
+    After a cut the limit recovers to just under where it was cut and stays there
+    until the cooldown has passed; beyond that it probes ten times more slowly, so it
+    settles near the real quota instead of repeatedly overshooting it. A Retry-After
+    from the service pauses every caller until it has passed. Current limits are
+    exported as gauges.
+    """
+
+    def __init__(self, name, initial=4, minimum=1, maximum=32, backoff=0.5, latency_tolerance=2.0, cooldown=5.0):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        # Moving averages of successful call latency: slow (baseline) and fast (recent)
+        self.baseline = None
+        self.recent = None
+        # Limit at the last cut, i.e. roughly where the service starts pushing back
+        self.ceiling = None
+        self.blocked_until = 0.0
+        self.stats = {"calls": 0, "rate_limited": 0, "timeouts": 0, "unavailable": 0, "errors": 0}
+        self._last_cut = float("-inf")
+        self._condition = threading.Condition()
+        self._export()
+
+    def _export(self):
+        set_gauge("adaptive_concurrency_limit", int(self.limit), limiter=self.name)
+        set_gauge("adaptive_in_flight", self.in_flight, limiter=self.name)
+
+    def acquire(self):
+        """Block until a call may start."""
+        with self._condition:
+            while True:
+                wait = self.blocked_until - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(wait)
+                elif self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    self._export()
+                    return
+                else:
+                    self._condition.wait()
+
+    def _cut(self, now, factor):
+        if now - self._last_cut >= self.cooldown:
+            self.ceiling = self.limit
+            self.limit = max(self.minimum, self.limit * factor)
+            self._last_cut = now
+
+    def _update_latency(self, latency):
+        """Fold a successful call's latency into both averages. Returns the recent average."""
+        if self.baseline is None:
+            self.baseline = self.recent = latency
+        else:
+            self.baseline = 0.95 * self.baseline + 0.05 * latency
+            self.recent = 0.7 * self.recent + 0.3 * latency
+        return self.recent
+
+    def release(self, latency, outcome="ok", retry_after=None):
+        """Finish a call, adapting the limit to its latency and outcome."""
+        now = time.monotonic()
+        with self._condition:
+            self.in_flight -= 1
+            self.stats["calls"] += 1
+            if outcome in OVERLOAD_OUTCOMES:
+                self.stats["timeouts" if outcome == "timeout" else outcome] += 1
+                self._cut(now, self.backoff)
+                # Only a 429 or an explicit Retry-After pauses every caller; other retries back off on their own
+                pause = retry_after if retry_after is not None else (ADAPTIVE_DEFAULT_BACKOFF if outcome == "rate_limited" else 0)
+                self.blocked_until = max(self.blocked_until, now + pause)
+                if pause:
+                    print(f"⏳ {self.name}: {outcome.replace('_', ' ')}, limit {int(self.limit)}, pausing {pause:.1f}s")
+            elif outcome == "error":
+                self.stats["errors"] += 1
+            elif self._update_latency(latency) > self.baseline * self.latency_tolerance:
+                # Queueing on the service side; back off gently before it turns into 429s
+                self._cut(now, 0.9)
+            else:
+                step, cap = 1 / max(self.limit, 1), self.maximum
+                if self.ceiling is not None:
+                    if now - self._last_cut < self.cooldown:
+                        cap = min(cap, max(self.limit, self.ceiling - 1))
+                    elif self.limit >= self.ceiling - 1:
+                        step /= 10
+                self.limit = min(cap, self.limit + step)
+            self._export()
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold one concurrency slot for the duration of a call."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            outcome, retry_after = classify_error(e)
+            self.release(time.monotonic() - started, outcome, retry_after)
+            raise
+        self.release(time.monotonic() - started)
+
+    def call(self, fn, *args, retries=ADAPTIVE_MAX_RETRIES, **kwargs):
+        """
+        Call fn within a slot. 429s are retried after the limiter's pause; timeouts,
+        5xx and connection errors after an exponential backoff. Other errors are raised.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.slot():
+                    return fn(*args, **kwargs)
+            except Exception as e:
+                outcome, retry_after = classify_error(e)
+                if attempt == retries or outcome not in OVERLOAD_OUTCOMES:
+                    raise
+                if outcome != "rate_limited" and retry_after is None:
+                    time.sleep(retry_delay(attempt))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_adaptive_limiter(name, **settings):
+    """Get the process-wide limiter for a service, creating it with `settings` on first use."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveLimiter(name, **settings)
+        return _limiters[name]
+
+
+def limiter_states():
+    """Current limit, calls in flight and outcome counts of every limiter."""
+    with _limiters_lock:
+        return {
+            name: {"limit": int(limiter.limit), "in_flight": limiter.in_flight, **limiter.stats}
+            for name, limiter in _limiters.items()
+        }
@@ -9,6 +9,14 @@ def load_env():
     }
 
 
+def get_data_dir():
+    """Directory for local state such as sync watermarks and caches, created on first use."""
+    load_dotenv()
+    path = os.getenv("MERGESTACK_DATA_DIR", ".mergestack")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
 
 
 def date_to_milliseconds(date_input):
@@ -0,0 +1,260 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+# Append every span and question breakdown to this JSON lines file when set
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH")
+# Serve Prometheus text on this port when set (see start_metrics_server)
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_PREFIX = "mergestack"
+# Upper bounds in seconds of the stage duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_stages = {}
+_gauges = {}
+_jsonl_file = None
+_current_trace = contextvars.ContextVar("mergestack_question_trace", default=None)
+
+
+def _new_stage():
+    return {
+        "calls": 0,
+        "errors": 0,
+        "seconds": 0.0,
+        "max_seconds": 0.0,
+        "buckets": [0] * len(DURATION_BUCKETS),
+        "counters": defaultdict(float),
+    }
+
+
+def _write_jsonl(record):
+    global _jsonl_file
+    if not METRICS_JSONL_PATH:
+        return
+    line = json.dumps(record, default=str)
+    with _lock:
+        if _jsonl_file is None:
+            _jsonl_file = open(METRICS_JSONL_PATH, "a", encoding="utf-8")
+        _jsonl_file.write(line + "\n")
+        _jsonl_file.flush()
+
+
+def record_span(stage, seconds, counts=None, error=None, **labels):
+    """Record one finished stage call with its duration and numeric counts (items, bytes, tokens, ...)."""
+    if not METRICS_ENABLED:
+        return
+    counts = {k: v for k, v in (counts or {}).items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    key = (stage, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _lock:
+        aggregate = _stages.setdefault(key, _new_stage())
+        aggregate["calls"] += 1
+        aggregate["errors"] += 1 if error else 0
+        aggregate["seconds"] += seconds
+        aggregate["max_seconds"] = max(aggregate["max_seconds"], seconds)
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                aggregate["buckets"][i] += 1
+        for name, value in counts.items():
+            aggregate["counters"][name] += value
+
+    trace = _current_trace.get()
+    if trace is not None:
+        with trace["lock"]:
+            stage_total = trace["stages"].setdefault(stage, {"calls": 0, "seconds": 0.0})
+            stage_total["calls"] += 1
+            stage_total["seconds"] += seconds
+            for name, value in counts.items():
+                stage_total[name] = stage_total.get(name, 0) + value
+
+    _write_jsonl({
+        "type": "span",
+        "time": time.time(),
+        "stage": stage,
+        "seconds": round(seconds, 6),
+        **({"labels": labels} if labels else {}),
+        **({"counts": counts} if counts else {}),
+        **({"error": error} if error else {}),
+    })
+
+
+@contextmanager
+def span(stage, **labels):
+    """
+    Time a pipeline stage. Yields a dict the caller fills with numeric counts,
+    e.g. `s["items"] = len(batch)`, `s["bytes"] = ...`, `s["prompt_tokens"] = ...`.
+    Exceptions are counted as errors and re-raised.
+    """
+    counts = {}
+    started = time.perf_counter()
+    try:
+        yield counts
+    except GeneratorExit:
+        # A streaming consumer stopped early; that is not a failure of the stage
+        record_span(stage, time.perf_counter() - started, counts, **labels)
+        raise
+    except BaseException as e:
+        record_span(stage, time.perf_counter() - started, counts, error=type(e).__name__, **labels)
+        raise
+    record_span(stage, time.perf_counter() - started, counts, **labels)
+
+
+def set_gauge(name, value, **labels):
+    """Set a point-in-time value such as a current concurrency limit."""
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        _gauges[(name, tuple(sorted((k, str(v)) for k, v in labels.items())))] = value
+
+
+def submit_with_context(pool, fn, *args, **kwargs):
+    """Submit to an executor so spans in the worker still count towards the caller's question trace."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@contextmanager
+def question_trace(question, namespace=None):
+    """
+    Collect a per-stage latency breakdown of every span recorded while answering one question.
+
+    Yields the trace dict; on exit it holds "total_seconds" and "stages"
+    ({stage: {"calls", "seconds", ...counts}}) and is written to the JSON lines log.
+    """
+    trace = {"question": question, "namespace": namespace, "stages": {}, "lock": threading.Lock()}
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace["total_seconds"] = time.perf_counter() - started
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context; the trace is still complete
+            pass
+        if METRICS_ENABLED:
+            _write_jsonl({
+                "type": "question",
+                "time": time.time(),
+                "question": question,
+                "namespace": namespace,
+                "total_seconds": round(trace["total_seconds"], 6),
+                "stages": trace["stages"],
+            })
+
+
+def format_breakdown(stages):
+    """One-line summary of a question trace's stages, slowest first."""
+    ordered = sorted(stages.items(), key=lambda item: item[1]["seconds"], reverse=True)
+    return ", ".join(f"{stage} {totals['seconds']:.2f}s" for stage, totals in ordered) or "no stages"
+
+
+def snapshot():
+    """Aggregated metrics per stage and label set, plus gauges, as plain JSON-serializable dicts."""
+    with _lock:
+        gauges = [
+            {"gauge": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in _gauges.items()
+        ]
+        return gauges + [
+            {
+                "stage": stage,
+                "labels": dict(labels),
+                "calls": aggregate["calls"],
+                "errors": aggregate["errors"],
+                "seconds": aggregate["seconds"],
+                "max_seconds": aggregate["max_seconds"],
+                **dict(aggregate["counters"]),
+            }
+            for (stage, labels), aggregate in _stages.items()
+        ]
+
+
+def reset_metrics():
+    """Drop all aggregated metrics."""
+    with _lock:
+        _stages.clear()
+        _gauges.clear()
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + [(k, str(v)) for k, v in extra.items()]
+    if not pairs:
+        return ""
+    escape = lambda value: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    """Render the aggregated metrics in the Prometheus text exposition format."""
+    name = f"{METRICS_PREFIX}_stage"
+    with _lock:
+        items = sorted(_stages.items())
+        lines = [
+            f"# HELP {name}_duration_seconds Time spent per pipeline stage call.",
+            f"# TYPE {name}_duration_seconds histogram",
+        ]
+        for (stage, labels), aggregate in items:
+            base = (("stage", stage),) + labels
+            for bound, count in zip(DURATION_BUCKETS, aggregate["buckets"]):
+                lines.append(f"{name}_duration_seconds_bucket{_format_labels(base, le=bound)} {count}")
+            lines.append(f"{name}_duration_seconds_bucket{_format_labels(base, le='+Inf')} {aggregate['calls']}")
+            lines.append(f"{name}_duration_seconds_sum{_format_labels(base)} {aggregate['seconds']}")
+            lines.append(f"{name}_duration_seconds_count{_format_labels(base)} {aggregate['calls']}")
+
+        lines += [f"# HELP {name}_errors_total Failed pipeline stage calls.", f"# TYPE {name}_errors_total counter"]
+        for (stage, labels), aggregate in items:
+            lines.append(f"{name}_errors_total{_format_labels((('stage', stage),) + labels)} {aggregate['errors']}")
+
+        counter_names = sorted({counter for _, aggregate in items for counter in aggregate["counters"]})
+        for counter in counter_names:
+            metric = f"{name}_{counter}_total"
+            lines += [f"# HELP {metric} Sum of {counter} recorded by pipeline stages.", f"# TYPE {metric} counter"]
+            for (stage, labels), aggregate in items:
+                if counter in aggregate["counters"]:
+                    lines.append(f"{metric}{_format_labels((('stage', stage),) + labels)} {aggregate['counters'][counter]}")
+
+        for gauge in sorted({name for name, _ in _gauges}):
+            lines.append(f"# TYPE {METRICS_PREFIX}_{gauge} gauge")
+            for (name, labels), value in sorted(_gauges.items()):
+                if name == gauge:
+                    lines.append(f"{METRICS_PREFIX}_{gauge}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = render_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(snapshot()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """Serve /metrics (Prometheus text) and /metrics.json in a daemon thread. Returns the server."""
+    port = int(port or METRICS_PORT or 9464)
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"📈 Metrics available at http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,65 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `limit / period` per second up to `limit`.
+    The bucket can be re-synced from server-reported rate-limit state so that
+    callers slow down before the server starts rejecting requests.
+    """
+
+    def __init__(self, limit, period=60.0):
+        self.limit = limit
+        self.period = period
+        self.tokens = float(limit)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        rate = self.limit / self.period
+        self.tokens = min(self.limit, self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens are available, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = max(
+                    self.blocked_until - now,
+                    (tokens - self.tokens) / (self.limit / self.period),
+                )
+            time.sleep(min(max(wait, 0.01), self.period))
+
+    def pause(self, seconds):
+        """Stop handing out tokens for the next `seconds` seconds."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def sync(self, limit=None, remaining=None, reset_at=None):
+        """
+        Align the bucket with rate-limit state reported by the server.
+
+        Args:
+            limit (int): Requests allowed per period.
+            remaining (int): Requests left in the current window.
+            reset_at (float): Unix time (seconds) at which the window resets.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.limit = limit
+            if remaining is not None:
+                # Never assume more headroom than the server reports
+                self.tokens = min(self.tokens, float(remaining))
+                if remaining <= 0 and reset_at:
+                    self.blocked_until = max(self.blocked_until, now + max(reset_at - time.time(), 0))
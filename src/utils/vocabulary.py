@@ -0,0 +1,52 @@
+# src/utils/vocabulary.py
+import json
+import os
+import threading
+from src.utils.helpers import get_data_dir
+
+VOCABULARY_FILE = "vocabulary.json"
+
+_lock = threading.Lock()
+
+
+def _vocabulary_path():
+    return os.path.join(get_data_dir(), VOCABULARY_FILE)
+
+
+def load_known_names():
+    """Load the lowercased assignee and project names seen during ingest."""
+    try:
+        with open(_vocabulary_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    return {
+        "assignees": set(data.get("assignees", [])),
+        "projects": set(data.get("projects", [])),
+    }
+
+
+def vocabulary_version():
+    """Changes whenever the vocabulary file is rewritten, including by another process."""
+    try:
+        return os.stat(_vocabulary_path()).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def add_known_names(assignees=(), projects=()):
+    """Merge newly seen assignee and project names into the vocabulary file."""
+    with _lock:
+        known = load_known_names()
+        new_assignees = {a.lower() for a in assignees if a} - known["assignees"]
+        new_projects = {p.lower() for p in projects if p} - known["projects"]
+        if not new_assignees and not new_projects:
+            return
+        data = {
+            "assignees": sorted(known["assignees"] | new_assignees),
+            "projects": sorted(known["projects"] | new_projects),
+        }
+        tmp_path = _vocabulary_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, _vocabulary_path())
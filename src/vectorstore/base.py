@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+
+
+class VectorStore(ABC):
+    """
+    Interface shared by the vector store backends.
+
+    Query results use Pinecone's shape so callers do not care which backend is used:
+      {"matches": [{"id": str, "score": float, "metadata": dict, "values": list}]}
+    """
+
+    @abstractmethod
+    def upsert(self, vectors, namespace="default"):
+        """Store [{"id", "values", "metadata"}] vectors. Returns {"upserted": int, "failed": [...]}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(self, vector, top_k=10, namespace="default", filter=None, include_metadata=True, include_values=False):
+        """Return the top_k vectors most similar to `vector` that match the metadata filter."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, ids, namespace="default"):
+        """Delete vectors by ID."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_ids(self, namespace="default", prefix=None):
+        """Yield the IDs stored in a namespace, optionally only those starting with prefix."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def namespace_counts(self):
+        """Return {namespace: vector count} for every namespace in the store."""
+        raise NotImplementedError
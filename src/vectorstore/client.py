@@ -0,0 +1,27 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "pinecone" (default) or "local"
+VECTOR_STORE = os.getenv("VECTOR_STORE", "pinecone").lower()
+
+_store = None
+_lock = threading.Lock()
+
+
+def get_vector_store():
+    """Get the process-wide vector store selected by the VECTOR_STORE env var."""
+    global _store
+    with _lock:
+        if _store is None:
+            if VECTOR_STORE == "local":
+                from src.vectorstore.local_store import LocalVectorStore
+                _store = LocalVectorStore()
+            elif VECTOR_STORE == "pinecone":
+                from src.vectorstore.pinecone_store import PineconeVectorStore
+                _store = PineconeVectorStore()
+            else:
+                raise ValueError(f"Unknown VECTOR_STORE: {VECTOR_STORE}")
+        return _store
@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+from src.utils.helpers import get_data_dir
+from src.vectorstore.base import VectorStore
+from src.vectorstore.metadata_filter import FilterIndex
+
+LOCAL_VECTORS_DIR = "vectors"
+RECORDS_FILE = "records.sqlite3"
+
+
+class _Namespace:
+    """
+    One namespace on disk: a float32 matrix of unit-normalized vectors in
+    `vectors.f32` (memory-mapped) plus `records.sqlite3` holding the ID and
+    metadata of each matrix row, so an upsert only writes the rows it touches.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.ids, self.metadata, self.rows = [], [], {}
+        self.dim = None
+        self.matrix = None
+        self.filter_index = None
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, RECORDS_FILE), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS records (row INTEGER PRIMARY KEY, id TEXT NOT NULL, metadata TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._import_json_records()
+
+        dim = self._conn.execute("SELECT value FROM settings WHERE key = 'dim'").fetchone()
+        if dim:
+            self.dim = int(dim[0])
+            for vector_id, metadata in self._conn.execute("SELECT id, metadata FROM records ORDER BY row"):
+                self.ids.append(vector_id)
+                self.metadata.append(json.loads(metadata))
+            self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+            # Drop vectors appended by an upsert that stopped before its records were written
+            expected_bytes = len(self.ids) * self.dim * 4
+            if os.path.exists(self._vectors_path) and os.path.getsize(self._vectors_path) > expected_bytes:
+                os.truncate(self._vectors_path, expected_bytes)
+            self._map()
+
+    def _import_json_records(self):
+        """Move records from the records.json file used by earlier versions into SQLite."""
+        json_path = os.path.join(self.path, "records.json")
+        if not os.path.exists(json_path):
+            return
+        with open(json_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM records")
+        self._conn.executemany(
+            "INSERT INTO records VALUES (?, ?, ?)",
+            ((row, vector_id, json.dumps(metadata)) for row, (vector_id, metadata) in enumerate(zip(records["ids"], records["metadata"]))),
+        )
+        self._conn.execute("INSERT OR REPLACE INTO settings VALUES ('dim', ?)", (str(records["dim"]),))
+        self._conn.execute("COMMIT")
+        os.remove(json_path)
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.path, "vectors.f32")
+
+    def _map(self):
+        if self.ids:
+            self.matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(len(self.ids), self.dim))
+        else:
+            self.matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+
+    def _save_records(self, rows, drop_from=None):
+        """Write the ID and metadata of the given matrix rows, after dropping rows from `drop_from` on."""
+        self._conn.execute("BEGIN")
+        if drop_from is not None:
+            self._conn.execute("DELETE FROM records WHERE row >= ?", (drop_from,))
+        self._conn.execute("INSERT OR REPLACE INTO settings VALUES ('dim', ?)", (str(self.dim),))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+            ((row, self.ids[row], json.dumps(self.metadata[row])) for row in rows),
+        )
+        self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _normalize(values):
+        matrix = np.asarray(values, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def upsert(self, vectors):
+        with self.lock:
+            if self.dim is None:
+                self.dim = len(vectors[0]["values"])
+            normalized = self._normalize([v["values"] for v in vectors])
+
+            # Existing rows are overwritten in place; new IDs are appended to the file
+            stored_rows = len(self.ids)
+            appended = []
+            changed = set()
+            for vector, values in zip(vectors, normalized):
+                row = self.rows.get(vector["id"])
+                changed.add(row if row is not None else len(self.ids))
+                if row is None:
+                    self.rows[vector["id"]] = len(self.ids)
+                    self.ids.append(vector["id"])
+                    self.metadata.append(vector.get("metadata", {}))
+                    appended.append(values)
+                elif row >= stored_rows:
+                    appended[row - stored_rows] = values
+                    self.metadata[row] = vector.get("metadata", {})
+                else:
+                    self.matrix[row] = values
+                    self.metadata[row] = vector.get("metadata", {})
+
+            self.filter_index = None
+            if isinstance(self.matrix, np.memmap):
+                self.matrix.flush()
+            if appended:
+                self.matrix = None  # release the old mapping before growing the file
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.asarray(appended, dtype=np.float32).tobytes())
+                self._map()
+            self._save_records(sorted(changed))
+
+    def delete(self, ids):
+        with self.lock:
+            doomed = {self.rows[i] for i in ids if i in self.rows}
+            if not doomed:
+                return
+            keep = [row for row in range(len(self.ids)) if row not in doomed]
+            kept_matrix = np.array(self.matrix[keep], dtype=np.float32)
+            self.ids = [self.ids[row] for row in keep]
+            self.metadata = [self.metadata[row] for row in keep]
+            self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+            self.filter_index = None
+
+            # Rewrite the compacted matrix next to the old one, then swap it in
+            self.matrix = None
+            tmp_path = self._vectors_path + ".tmp"
+            kept_matrix.tofile(tmp_path)
+            os.replace(tmp_path, self._vectors_path)
+            self._map()
+            # Rows after the first deleted one have moved up
+            self._save_records(range(min(doomed), len(self.ids)), drop_from=min(doomed))
+
+    def query(self, vector, top_k, metadata_filter):
+        with self.lock:
+            if not self.ids:
+                return []
+            scores = self.matrix @ self._normalize(vector)
+            if metadata_filter:
+                if self.filter_index is None:
+                    self.filter_index = FilterIndex(self.metadata)
+                candidates = np.flatnonzero(self.filter_index.evaluate(metadata_filter))
+                scores = scores[candidates]
+            else:
+                candidates = np.arange(len(self.ids))
+
+            k = min(top_k, len(candidates))
+            if k == 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(candidates[i]), float(scores[i])) for i in top]
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Offline vector store: a memory-mapped float32 matrix per namespace with
+    vectorized cosine top-k and an in-memory columnar metadata filter.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), LOCAL_VECTORS_DIR)
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace, create=False):
+        """Open a namespace; returns None for one that is not on disk unless `create` is set."""
+        with self._lock:
+            if namespace not in self._namespaces:
+                path = os.path.join(self.path, namespace)
+                if not create and not os.path.isdir(path):
+                    return None
+                self._namespaces[namespace] = _Namespace(path)
+            return self._namespaces[namespace]
+
+    def upsert(self, vectors, namespace="default"):
+        vectors = list(vectors)
+        if vectors:
+            self._namespace(namespace, create=True).upsert(vectors)
+        return {"upserted": len(vectors), "failed": []}
+
+    def query(self, vector, top_k=10, namespace="default", filter=None, include_metadata=True, include_values=False):
+        ns = self._namespace(namespace)
+        if ns is None:
+            return {"matches": []}
+        with ns.lock:
+            return {
+                "matches": [
+                    {
+                        "id": ns.ids[row],
+                        "score": score,
+                        "metadata": ns.metadata[row] if include_metadata else {},
+                        "values": ns.matrix[row].tolist() if include_values else [],
+                    }
+                    for row, score in ns.query(vector, top_k, filter)
+                ]
+            }
+
+    def delete(self, ids, namespace="default"):
+        ns = self._namespace(namespace)
+        if ns is not None:
+            ns.delete(list(ids))
+
+    def list_ids(self, namespace="default", prefix=None):
+        ns = self._namespace(namespace)
+        if ns is None:
+            return iter(())
+        with ns.lock:
+            ids = list(ns.ids)
+        return (vector_id for vector_id in ids if not prefix or vector_id.startswith(prefix))
+
+    def namespace_counts(self):
+        if not os.path.isdir(self.path):
+            return {}
+        return {
+            namespace: len(self._namespace(namespace).ids)
+            for namespace in os.listdir(self.path)
+            if os.path.isdir(os.path.join(self.path, namespace))
+        }
@@ -0,0 +1,111 @@
+import numbers
+import numpy as np
+
+
+class FilterIndex:
+    """
+    Columnar view of a namespace's metadata for evaluating Pinecone-style filters.
+
+    Per-field value postings and numeric columns are built lazily the first time a
+    field is filtered on, after which a filter evaluates to a boolean row mask with
+    a handful of vectorized operations. Supports $and/$or plus the $eq, $ne, $in,
+    $nin, $gt, $gte, $lt, $lte and $exists field operators, with Pinecone's
+    semantics for list-valued fields (a list matches when any element matches).
+    """
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.size = len(metadata)
+        self._postings = {}
+        self._numeric = {}
+        self._present = {}
+
+    def _build_field(self, field):
+        postings, present = {}, np.zeros(self.size, dtype=bool)
+        numeric = np.full(self.size, np.nan)
+        for row, metadata in enumerate(self.metadata):
+            if field not in metadata:
+                continue
+            present[row] = True
+            value = metadata[field]
+            for item in value if isinstance(value, list) else [value]:
+                try:
+                    postings.setdefault(item, []).append(row)
+                except TypeError:
+                    continue  # unhashable values cannot be matched by equality
+            if isinstance(value, numbers.Number) and not isinstance(value, bool):
+                numeric[row] = value
+        self._postings[field] = {value: np.asarray(rows) for value, rows in postings.items()}
+        self._numeric[field] = numeric
+        self._present[field] = present
+
+    def _column(self, kind, field):
+        if field not in self._present:
+            self._build_field(field)
+        return getattr(self, f"_{kind}")[field]
+
+    def _equals_any(self, field, targets):
+        mask = np.zeros(self.size, dtype=bool)
+        postings = self._column("postings", field)
+        for target in targets:
+            rows = postings.get(target)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def _field_mask(self, field, condition):
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        present = self._column("present", field)
+        # Only $exists can match rows without the field
+        mask = present.copy() if any(op != "$exists" for op in condition) else np.ones(self.size, dtype=bool)
+        for op, target in condition.items():
+            if op == "$exists":
+                mask &= present if target else ~present
+            elif op == "$eq":
+                mask &= self._equals_any(field, [target])
+            elif op == "$ne":
+                mask &= ~self._equals_any(field, [target])
+            elif op == "$in":
+                mask &= self._equals_any(field, target)
+            elif op == "$nin":
+                mask &= ~self._equals_any(field, target)
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                # Pinecone rejects these filters too, rather than matching nothing
+                if not isinstance(target, numbers.Number) or isinstance(target, bool):
+                    raise ValueError(f"Filter operator {op} on {field!r} needs a number, got {target!r}")
+                # Non-numeric values (e.g. a "None" placeholder) are NaN and never match
+                numeric = self._column("numeric", field)
+                with np.errstate(invalid="ignore"):
+                    if op == "$gt":
+                        mask &= numeric > target
+                    elif op == "$gte":
+                        mask &= numeric >= target
+                    elif op == "$lt":
+                        mask &= numeric < target
+                    else:
+                        mask &= numeric <= target
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    def evaluate(self, metadata_filter):
+        """Return a boolean mask of the rows whose metadata matches the filter."""
+        mask = np.ones(self.size, dtype=bool)
+        for key, condition in (metadata_filter or {}).items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self.evaluate(sub)
+            elif key == "$or":
+                any_mask = np.zeros(self.size, dtype=bool)
+                for sub in condition:
+                    any_mask |= self.evaluate(sub)
+                mask &= any_mask
+            else:
+                mask &= self._field_mask(key, condition)
+        return mask
+
+
+def matches_filter(metadata, metadata_filter):
+    """Evaluate a Pinecone-style metadata filter against one vector's metadata."""
+    return bool(FilterIndex([metadata]).evaluate(metadata_filter)[0])
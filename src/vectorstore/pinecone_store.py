@@ -0,0 +1,55 @@
+from src.pinecone.client import get_pinecone_index, upsert_vectors
+from src.vectorstore.base import VectorStore
+
+# Pinecone accepts at most 1000 IDs per delete request
+DELETE_BATCH_SIZE = 1000
+
+
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by the shared Pinecone index."""
+
+    def __init__(self, index=None):
+        self.index = index or get_pinecone_index()
+
+    def upsert(self, vectors, namespace="default"):
+        return upsert_vectors(self.index, vectors, namespace=namespace)
+
+    def query(self, vector, top_k=10, namespace="default", filter=None, include_metadata=True, include_values=False):
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter if filter else {},
+            include_metadata=include_metadata,
+            include_values=include_values
+        )
+        return {
+            "matches": [
+                {
+                    "id": match["id"],
+                    "score": match.get("score"),
+                    "metadata": match.get("metadata") or {},
+                    "values": match.get("values") or [],
+                }
+                for match in results["matches"]
+            ]
+        }
+
+    def delete(self, ids, namespace="default"):
+        ids = list(ids)
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            self.index.delete(ids=ids[start:start + DELETE_BATCH_SIZE], namespace=namespace)
+
+    def list_ids(self, namespace="default", prefix=None):
+        kwargs = {"namespace": namespace}
+        if prefix:
+            kwargs["prefix"] = prefix
+        for page in self.index.list(**kwargs):
+            yield from page
+
+    def namespace_counts(self):
+        stats = self.index.describe_index_stats()
+        return {
+            namespace: summary["vector_count"]
+            for namespace, summary in (stats["namespaces"] or {}).items()
+        }
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Local state and clients are configured from the environment at import time,
+# so point them at a scratch directory before any src module is imported
+os.environ.setdefault("MERGESTACK_DATA_DIR", tempfile.mkdtemp(prefix="mergestack-tests-"))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
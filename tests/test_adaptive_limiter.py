@@ -0,0 +1,147 @@
+import threading
+import time
+import httpx
+import openai
+import pytest
+from src.utils import adaptive_limiter
+from src.utils.adaptive_limiter import AdaptiveLimiter, classify_error
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+
+
+def _status_error(cls, status, headers=None):
+    return cls("failed", response=httpx.Response(status, headers=headers or {}, request=REQUEST), body=None)
+
+
+@pytest.mark.parametrize("error, outcome", [
+    (_status_error(openai.RateLimitError, 429), "rate_limited"),
+    (_status_error(openai.InternalServerError, 500), "unavailable"),
+    (_status_error(openai.InternalServerError, 503), "unavailable"),
+    (_status_error(openai.InternalServerError, 504), "timeout"),
+    (openai.APIConnectionError(request=REQUEST), "unavailable"),
+    (openai.APITimeoutError(request=REQUEST), "timeout"),
+    (ConnectionResetError(), "unavailable"),
+    (TimeoutError(), "timeout"),
+    (_status_error(openai.BadRequestError, 400), "error"),
+    (_status_error(openai.AuthenticationError, 401), "error"),
+    (ValueError("bad input"), "error"),
+])
+def test_classify_error(error, outcome):
+    assert classify_error(error)[0] == outcome
+
+
+def test_retry_after_headers():
+    assert classify_error(_status_error(openai.RateLimitError, 429, {"retry-after": "3"})) == ("rate_limited", 3.0)
+    assert classify_error(_status_error(openai.RateLimitError, 429, {"retry-after-ms": "250"})) == ("rate_limited", 0.25)
+
+
+class Flaky:
+    """Fails with the given errors in turn, then succeeds."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(adaptive_limiter, "retry_delay", lambda attempt: 0)
+
+
+@pytest.mark.parametrize("error", [
+    _status_error(openai.InternalServerError, 500),
+    openai.APIConnectionError(request=REQUEST),
+    openai.APITimeoutError(request=REQUEST),
+    _status_error(openai.RateLimitError, 429, {"retry-after-ms": "1"}),
+])
+def test_transient_errors_are_retried(error):
+    limiter = AdaptiveLimiter("test", initial=4)
+    fn = Flaky(error, error)
+    assert limiter.call(fn) == "ok"
+    assert fn.calls == 3
+    assert int(limiter.limit) == 2  # one cut per cooldown, however many failures
+    assert limiter.in_flight == 0
+
+
+def test_permanent_errors_are_not_retried():
+    limiter = AdaptiveLimiter("test", initial=4)
+    fn = Flaky(_status_error(openai.BadRequestError, 400))
+    with pytest.raises(openai.BadRequestError):
+        limiter.call(fn)
+    assert fn.calls == 1
+    assert limiter.limit == 4
+
+
+def test_gives_up_after_retries():
+    limiter = AdaptiveLimiter("test")
+    fn = Flaky(*[ConnectionResetError()] * 5)
+    with pytest.raises(ConnectionResetError):
+        limiter.call(fn, retries=2)
+    assert fn.calls == 3
+    assert limiter.stats["unavailable"] == 3
+
+
+def test_limit_grows_with_healthy_calls_and_caps_concurrency():
+    limiter = AdaptiveLimiter("test", initial=2, maximum=3)
+    for _ in range(20):
+        limiter.call(lambda: None)
+    assert limiter.limit == 3
+
+    running, peak, lock = 0, 0, threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 3
+
+
+def test_recovers_to_just_below_the_limit_that_was_cut():
+    limiter = AdaptiveLimiter("test", initial=6, cooldown=60)
+    limiter.acquire()
+    limiter.release(0.01, "rate_limited", retry_after=0)
+    assert limiter.limit == 3
+    for _ in range(100):
+        limiter.call(lambda: None)
+    assert int(limiter.limit) == 5
+
+
+def _simulate(limiter, latencies, monkeypatch, seconds_apart=1.0):
+    """Release one call per latency, `seconds_apart` of (fake) time after the previous one."""
+    clock = [1000.0]
+    monkeypatch.setattr(adaptive_limiter.time, "monotonic", lambda: clock[0])
+    for latency in latencies:
+        limiter.acquire()
+        clock[0] += seconds_apart
+        limiter.release(latency)
+
+
+def test_mixed_small_and_large_calls_do_not_shrink_the_limit(monkeypatch):
+    limiter = AdaptiveLimiter("test", initial=4, maximum=16, cooldown=5)
+    # A one-input query embedding first, then steady large batches with the odd small one
+    latencies = [0.1] + [0.1 if i % 10 == 0 else 1.0 for i in range(300)]
+    _simulate(limiter, latencies, monkeypatch)
+    assert limiter.limit >= 4
+    assert limiter.baseline > 0.5
+
+
+def test_sustained_latency_rise_cuts_the_limit(monkeypatch):
+    limiter = AdaptiveLimiter("test", initial=8, maximum=8, cooldown=5)
+    _simulate(limiter, [0.1] * 50 + [0.5] * 5, monkeypatch)
+    assert limiter.limit < 8
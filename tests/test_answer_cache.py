@@ -0,0 +1,74 @@
+import time
+import numpy as np
+from src.clickup.catalog import update_namespace_entry
+from src.rag.answer_cache import AnswerCache, question_terms
+
+EMBEDDING = np.linspace(0.1, 1.0, 16).tolist()
+FILTER = {"updated_at_ms": {"$gte": 1}}
+
+
+def _cache(tmp_path, **settings):
+    return AnswerCache(path=str(tmp_path / "answers.sqlite3"), **settings)
+
+
+def test_rephrased_question_hits(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("ns-a", FILTER, EMBEDDING, "What did Ali do yesterday?", "Shipped the login page.")
+    hit = cache.get("ns-a", FILTER, EMBEDDING, "what has ali done yesterday")
+    assert hit["answer"] == "Shipped the login page."
+
+
+def test_different_person_never_hits_even_with_identical_embedding(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("ns-a", FILTER, EMBEDDING, "What did Ali do yesterday?", "Shipped the login page.")
+    assert cache.get("ns-a", FILTER, EMBEDDING, "What did Sara do yesterday?") is None
+    assert question_terms("What did Ali do yesterday?") != question_terms("What did Sara do yesterday?")
+
+
+def test_filter_and_namespace_are_part_of_the_key(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(["ns-b", "ns-a"], FILTER, EMBEDDING, "status of MIRA", "On track.")
+    assert cache.get(["ns-a", "ns-b"], FILTER, EMBEDDING, "status of MIRA")["answer"] == "On track."
+    assert cache.get("ns-a", FILTER, EMBEDDING, "status of MIRA") is None
+    assert cache.get(["ns-a", "ns-b"], {}, EMBEDDING, "status of MIRA") is None
+
+
+def test_dissimilar_embedding_misses(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("ns-a", FILTER, EMBEDDING, "status of MIRA", "On track.")
+    assert cache.get("ns-a", FILTER, list(reversed(EMBEDDING)), "status of MIRA") is None
+
+
+def test_invalidating_a_namespace_drops_multi_namespace_answers(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("ns-a", FILTER, EMBEDDING, "status of MIRA", "A")
+    cache.put(["ns-a", "ns-b"], FILTER, EMBEDDING, "status of MIRA", "AB")
+    cache.put("ns-b", FILTER, EMBEDDING, "status of MIRA", "B")
+    cache.put("ns-ab", FILTER, EMBEDDING, "status of MIRA", "other")
+
+    assert cache.invalidate_namespace("ns-a") == 2
+    assert cache.get("ns-a", FILTER, EMBEDDING, "status of MIRA") is None
+    assert cache.get(["ns-a", "ns-b"], FILTER, EMBEDDING, "status of MIRA") is None
+    assert cache.get("ns-b", FILTER, EMBEDDING, "status of MIRA")["answer"] == "B"
+    assert cache.get("ns-ab", FILTER, EMBEDDING, "status of MIRA")["answer"] == "other"
+
+
+def test_new_sync_of_a_namespace_makes_its_answers_stale(tmp_path):
+    cache = _cache(tmp_path)
+    update_namespace_entry("ns-sync", last_synced_at="2025-01-01T00:00:00")
+    cache.put("ns-sync", FILTER, EMBEDDING, "status of MIRA", "old")
+    update_namespace_entry("ns-sync", last_synced_at="2025-01-02T00:00:00")
+    assert cache.get("ns-sync", FILTER, EMBEDDING, "status of MIRA") is None
+
+
+def test_ttl_and_size_limit(tmp_path):
+    expired = _cache(tmp_path, ttl=0)
+    expired.put("ns-a", FILTER, EMBEDDING, "status of MIRA", "old")
+    time.sleep(0.01)
+    assert expired.get("ns-a", FILTER, EMBEDDING, "status of MIRA") is None
+
+    small = AnswerCache(path=str(tmp_path / "small.sqlite3"), max_entries=2)
+    for project in ("alpha", "beta", "gamma"):
+        small.put("ns-a", FILTER, EMBEDDING, f"status of {project}", project)
+    assert small.get("ns-a", FILTER, EMBEDDING, "status of alpha") is None
+    assert small.get("ns-a", FILTER, EMBEDDING, "status of gamma")["answer"] == "gamma"
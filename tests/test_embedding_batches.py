@@ -0,0 +1,17 @@
+from src.openai.client import batch_by_tokens
+
+
+def test_batches_respect_token_budget():
+    assert list(batch_by_tokens([40, 40, 40, 10], max_inputs=10, max_tokens=100)) == [[0, 1], [2, 3]]
+
+
+def test_batches_respect_input_count():
+    assert list(batch_by_tokens([1] * 5, max_inputs=2, max_tokens=100)) == [[0, 1], [2, 3], [4]]
+
+
+def test_oversized_input_gets_its_own_batch():
+    assert list(batch_by_tokens([5, 500, 5], max_inputs=10, max_tokens=100)) == [[0], [1], [2]]
+
+
+def test_no_inputs_no_batches():
+    assert list(batch_by_tokens([])) == []
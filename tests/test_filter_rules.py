@@ -0,0 +1,26 @@
+from datetime import date
+
+import pytest
+from src.openai.filter_rules import extract_filters_locally
+
+VOCABULARY = {"today": date(2026, 10, 17), "known_assignees": {"ali"}, "known_projects": {"design", "mira"}}
+
+
+def test_unrecognised_question_falls_back_to_the_llm():
+    assert extract_filters_locally("status of the login bug", **VOCABULARY) == ({}, False)
+
+
+def test_past_week_is_the_last_seven_days():
+    filters, confident = extract_filters_locally("What did Ali do in the past week?", **VOCABULARY)
+    assert confident
+    assert filters["date_range"] == {"start": "2026-10-11T00:00:00", "end": "2026-10-17T23:59:59"}
+
+
+@pytest.mark.parametrize("question", ["What happened in Design yesterday?", "design project updates yesterday"])
+def test_project_named_as_a_project(question):
+    filters, confident = extract_filters_locally(question, **VOCABULARY)
+    assert confident and filters["project"] == "design"
+
+
+def test_project_name_as_an_ordinary_word_is_not_a_filter():
+    assert extract_filters_locally("design review of the login page yesterday", **VOCABULARY) == ({}, False)
@@ -0,0 +1,75 @@
+import json
+import os
+import numpy as np
+import pytest
+from src.vectorstore.base import VectorStore
+from src.vectorstore.local_store import LocalVectorStore
+
+
+def _vectors(count, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"id": f"t{i}#task#h{i}", "values": rng.normal(size=dim).tolist(), "metadata": {"i": i, "tag": "even" if i % 2 == 0 else "odd"}}
+        for i in range(count)
+    ]
+
+
+def test_query_returns_nearest_first_and_applies_filter(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    vectors = _vectors(20)
+    store.upsert(vectors, namespace="ns")
+
+    matches = store.query(vectors[4]["values"], top_k=3, namespace="ns")["matches"]
+    assert matches[0]["id"] == "t4#task#h4"
+    assert matches[0]["score"] > matches[1]["score"] >= matches[2]["score"]
+
+    odd = store.query(vectors[4]["values"], top_k=5, namespace="ns", filter={"tag": "odd"})["matches"]
+    assert len(odd) == 5 and all(m["metadata"]["tag"] == "odd" for m in odd)
+
+
+def test_state_survives_reopen_after_batched_upserts_updates_and_deletes(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    vectors = _vectors(30)
+    for start in range(0, 30, 7):
+        store.upsert(vectors[start:start + 7], namespace="ns")
+    store.upsert([{**vectors[3], "metadata": {"i": 3, "tag": "updated"}}], namespace="ns")
+    store.delete(["t0#task#h0", "t10#task#h10", "t29#task#h29"], namespace="ns")
+
+    reopened = LocalVectorStore(str(tmp_path))
+    assert sorted(reopened.list_ids("ns")) == sorted(store.list_ids("ns"))
+    assert len(list(reopened.list_ids("ns"))) == 27
+    for vector in (vectors[3], vectors[11], vectors[28]):
+        top = reopened.query(vector["values"], top_k=1, namespace="ns")["matches"][0]
+        assert top["id"] == vector["id"]
+    assert reopened.query(vectors[3]["values"], top_k=1, namespace="ns")["matches"][0]["metadata"]["tag"] == "updated"
+    assert list(reopened.list_ids("ns", prefix="t1")) == [f"t{i}#task#h{i}" for i in (1, 11, 12, 13, 14, 15, 16, 17, 18, 19)]
+
+
+def test_records_from_json_format_are_imported(tmp_path):
+    namespace_dir = tmp_path / "ns"
+    namespace_dir.mkdir()
+    np.asarray([[1, 0], [0, 1]], dtype=np.float32).tofile(namespace_dir / "vectors.f32")
+    with open(namespace_dir / "records.json", "w", encoding="utf-8") as f:
+        json.dump({"dim": 2, "ids": ["a", "b"], "metadata": [{"x": 1}, {"x": 2}]}, f)
+
+    store = LocalVectorStore(str(tmp_path))
+    assert store.query([0, 1], top_k=1, namespace="ns")["matches"][0]["metadata"] == {"x": 2}
+    assert not os.path.exists(namespace_dir / "records.json")
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class QueryOnlyStore(VectorStore):
+        def query(self, vector, top_k=10, namespace="default", filter=None, include_metadata=True, include_values=False):
+            return {"matches": []}
+
+    with pytest.raises(TypeError):
+        QueryOnlyStore()
+
+
+def test_reads_do_not_create_missing_namespaces(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    assert store.query([0.1] * 8, namespace="missing") == {"matches": []}
+    assert list(store.list_ids(namespace="missing")) == []
+    store.delete(["t1#task#a"], namespace="missing")
+    assert not os.path.exists(tmp_path / "missing")
+    assert store.namespace_counts() == {}
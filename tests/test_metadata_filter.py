@@ -0,0 +1,42 @@
+import pytest
+from src.vectorstore.metadata_filter import FilterIndex, matches_filter
+
+TASK = {"assignees": ["ali", "sara"], "project": "MIRA", "updated_at_ms": 1_700_000_000_000, "status": "open"}
+
+
+def test_equality_and_list_fields():
+    assert matches_filter(TASK, {"project": "MIRA"})
+    assert matches_filter(TASK, {"assignees": {"$in": ["sara", "omar"]}})
+    assert not matches_filter(TASK, {"assignees": {"$nin": ["ali"]}})
+    assert matches_filter(TASK, {"project": {"$ne": "Other"}})
+
+
+def test_ranges():
+    assert matches_filter(TASK, {"updated_at_ms": {"$gte": 1_600_000_000_000, "$lt": 1_800_000_000_000}})
+    assert not matches_filter(TASK, {"updated_at_ms": {"$gt": 1_700_000_000_000}})
+
+
+def test_non_numeric_field_values_never_match_ranges():
+    assert not matches_filter({"updated_at_ms": "None"}, {"updated_at_ms": {"$gte": 0}})
+
+
+@pytest.mark.parametrize("target", [None, "2025-01-01", True])
+def test_range_target_must_be_a_number(target):
+    with pytest.raises(ValueError, match=r"\$gte"):
+        matches_filter(TASK, {"updated_at_ms": {"$gte": target}})
+
+
+def test_exists_and_boolean_combinators():
+    assert matches_filter(TASK, {"$and": [{"status": "open"}, {"due": {"$exists": False}}]})
+    assert matches_filter(TASK, {"$or": [{"status": "closed"}, {"project": "MIRA"}]})
+    assert not matches_filter(TASK, {"$or": [{"status": "closed"}, {"project": "Other"}]})
+
+
+def test_unsupported_operator():
+    with pytest.raises(ValueError):
+        matches_filter(TASK, {"project": {"$regex": "M.*"}})
+
+
+def test_index_evaluates_rows():
+    index = FilterIndex([{"n": 1}, {"n": 2}, {}, {"n": 3}])
+    assert index.evaluate({"n": {"$gte": 2}}).tolist() == [False, True, False, True]
@@ -0,0 +1,35 @@
+import pytest
+from src.rag import reconcile
+from src.vectorstore.local_store import LocalVectorStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalVectorStore(str(tmp_path))
+    monkeypatch.setattr(reconcile, "get_vector_store", lambda: store)
+    store.upsert(
+        [{"id": vector_id, "values": [0.1, 0.2], "metadata": {}} for vector_id in (
+            "t1#task#new", "t1#comment#stale", "t2#task#a", "t3#task#a", "t4#task#a",
+        )],
+        namespace="ns",
+    )
+    return store
+
+
+def test_full_reconcile_only_deletes_tasks_confirmed_gone(store):
+    def task_exists(task_id):
+        if task_id == "t4":
+            raise RuntimeError("ClickUp unavailable")
+        return task_id == "t2"  # t2 still exists (e.g. archived); t3 was deleted
+
+    report = reconcile.reconcile_namespace("ns", {"t1#task#new"}, crawled_task_ids={"t1"}, task_exists=task_exists)
+
+    assert sorted(store.list_ids("ns")) == ["t1#task#new", "t2#task#a", "t4#task#a"]
+    assert report["deleted"] == 2 and report["kept_tasks"] == 2
+
+
+def test_incremental_reconcile_only_touches_recrawled_tasks(store):
+    report = reconcile.reconcile_namespace("ns", {"t1#task#new"}, task_ids={"t1"})
+    assert report["deleted"] == 1
+    assert "t1#comment#stale" not in set(store.list_ids("ns"))
+    assert "t3#task#a" in set(store.list_ids("ns"))
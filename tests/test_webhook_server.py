@@ -0,0 +1,74 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+from src.clickup import webhook_server
+from src.clickup.webhook_server import TaskDebouncer, make_handler
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_failed_reindex_is_retried_with_its_events():
+    calls = []
+
+    def handler(task_id, events):
+        calls.append((task_id, set(events)))
+        if len(calls) == 1:
+            raise RuntimeError("ClickUp unavailable")
+
+    debouncer = TaskDebouncer(handler, delay=0.01, max_delay=0.05, workers=1, retry_base=0.01)
+    try:
+        debouncer.submit("t1", "taskUpdated")
+        assert _wait_for(lambda: debouncer.stats["runs"] == 1)
+    finally:
+        debouncer.stop()
+    assert calls == [("t1", {"taskUpdated"}), ("t1", {"taskUpdated"})]
+    assert debouncer.stats["retries"] == 1 and debouncer.stats["failures"] == 0
+
+
+def test_task_is_given_up_after_max_retries():
+    def handler(task_id, events):
+        raise RuntimeError("still broken")
+
+    debouncer = TaskDebouncer(handler, delay=0.01, max_delay=0.05, workers=1, retry_base=0.01, max_retries=2)
+    try:
+        debouncer.submit("t1", "taskUpdated")
+        assert _wait_for(lambda: debouncer.stats["failures"] == 1)
+    finally:
+        debouncer.stop()
+    assert debouncer.stats["retries"] == 2 and not debouncer.pending
+
+
+@pytest.fixture
+def webhook_url(monkeypatch):
+    monkeypatch.setattr(webhook_server, "CLICKUP_WEBHOOK_SECRET", None)
+    debouncer = TaskDebouncer(lambda task_id, events: None, delay=0.01)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(debouncer))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}{webhook_server.CLICKUP_WEBHOOK_PATH}"
+    server.shutdown()
+    server.server_close()
+    debouncer.stop()
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_non_object_body_is_rejected(webhook_url):
+    assert _post(webhook_url, ["taskUpdated"]) == 400
+    assert _post(webhook_url, {"event": "taskUpdated", "task_id": "t1"}) == 202